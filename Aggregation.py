@@ -0,0 +1,200 @@
+"""
+Group-by aggregations of nodes of Ucte model: load, generation, balance and installed capacity per country, voltage
+level and power plant type, and net exchange of countries over tie lines to X-nodes. Results are compact tables,
+dictionaries {column name: NumPy array} with one row per group sorted by group keys.
+Generation is given as positive value (uct file has negative generation), balance = generation - load.
+Installed capacity is absolute value of maximum permissible generation.
+Many files are summarized in worker processes and only their small tables are kept, see aggregate_files.
+"""
+
+import numpy as np
+
+from Node import Node
+from Line import Line
+from Transformer import Transformer
+from NetworkTable import NetworkTable
+from BatchLoader import iter_map
+from YBus import get_nominal_voltages, line_statuses_out, transformer_statuses_out
+from Ucte import Ucte
+
+group_keys = ('country', 'voltage', 'power_plant_type')
+value_columns = ('active_load', 'reactive_load', 'generation', 'reactive_generation', 'balance', 'capacity')
+
+
+def get_node_columns(model):
+    """
+    Node codes, key and value columns of all nodes (without X-nodes)
+    :return: dictionary {column name: array}
+    """
+    blocks = [NetworkTable.from_records(Node, nodes) for nodes in model.nodes_by_country.values()]
+    nodes = NetworkTable.concatenate(Node, blocks)
+    country = np.repeat(np.array(list(model.nodes_by_country), dtype='U3'), [len(block) for block in blocks])
+
+    def column(name):
+        return np.nan_to_num(nodes.column(name))
+
+    active_load = column('active_load')
+    generation = -column('active_power_generation')
+    return {
+        'code': nodes.column('code'),
+        'country': country,
+        'voltage': get_nominal_voltages(nodes.column('code'), nodes.column('voltage')),
+        'power_plant_type': nodes.column('power_plant_type'),
+        'active_load': active_load,
+        'reactive_load': column('reactive_load'),
+        'generation': generation,
+        'reactive_generation': -column('reactive_power_generation'),
+        'balance': generation - active_load,
+        'capacity': np.abs(column('maximum_permissible_generation_mw')),
+    }
+
+
+def group_by(columns, by, values):
+    """
+    :param columns: dictionary {column name: array} (one row per element)
+    :param by: sequence of key column names
+    :param values: sequence of value column names (summed over group)
+    :return: dictionary {column name: array}: key columns, 'count' (number of elements) and value columns
+    """
+    if not by:
+        groups = np.zeros(len(columns[values[0]]) if values else 0, dtype=np.intp)
+        group_count = 1
+        output = {}
+    else:
+        uniques, inverses = zip(*[np.unique(columns[name], return_inverse=True) for name in by])
+        flat = np.ravel_multi_index([inverse.ravel() for inverse in inverses], [max(len(u), 1) for u in uniques])
+        flat_groups, first, groups = np.unique(flat, return_index=True, return_inverse=True)
+        groups = groups.ravel()
+        group_count = len(flat_groups)
+        output = {name: columns[name][first] for name in by}
+    output['count'] = np.bincount(groups, minlength=group_count)
+    for name in values:
+        output[name] = np.bincount(groups, weights=columns[name], minlength=group_count)
+    return output
+
+
+def aggregate(model, by=('country',), values=value_columns):
+    """
+    Sums values of nodes over groups, e.g. aggregate(model, ('country', 'power_plant_type'), ('capacity',))
+    :param model: Ucte (any mode, columnar is fastest)
+    :param by: sequence of 'country' (ISO country-code of node block), 'voltage' (nominal kV from node code) and
+    'power_plant_type' (empty string when not given), empty sequence gives totals
+    :param values: sequence of names from value_columns
+    :return: dictionary {column name: array}
+    """
+    for name in by:
+        if name not in group_keys:
+            raise ValueError("unknown group key %s" % name)
+    for name in values:
+        if name not in value_columns:
+            raise ValueError("unknown value column %s" % name)
+    return group_by(get_node_columns(model), list(by), list(values))
+
+
+def get_net_exchange(model, flows=None):
+    """
+    Net exchange of countries over tie lines (lines and transformers in operation between node and X-node),
+    positive for export. With flows of branches (e.g. from DcLoadFlow.solve) exchange is sum of flows on tie lines.
+    Without flows power consumed in X-node (load + generation of X-node) is used, which is exchange of its tie
+    line when X-node has one tie line in operation (national files). X-nodes with more tie lines need flows.
+    :param flows: array of flows in MW from node1 to node2 of lines followed by transformers or None
+    :return: dictionary {'country': array, 'net_exchange': array}
+    """
+    nodes = get_node_columns(model)
+    codes = nodes['code']
+    x_nodes = NetworkTable.from_records(Node, model.x_nodes)
+    x_codes = x_nodes.column('code')
+    lines = NetworkTable.from_records(Line, model.lines)
+    transformers = NetworkTable.from_records(Transformer, model.transformers)
+    node1 = np.concatenate([lines.column('node1'), transformers.column('node1')])
+    node2 = np.concatenate([lines.column('node2'), transformers.column('node2')])
+    in_operation = np.concatenate([~np.isin(lines.column('status'), line_statuses_out),
+                                   ~np.isin(transformers.column('status'), transformer_statuses_out)])
+    x_end1 = np.isin(node1, x_codes)
+    x_end2 = np.isin(node2, x_codes)
+    tie = in_operation & (x_end1 != x_end2)
+    country_code = np.where(x_end1, node2, node1)[tie]
+    x_code = np.where(x_end1, node1, node2)[tie]
+
+    order = np.argsort(codes, kind='stable')
+    position = np.minimum(np.searchsorted(codes[order], country_code), max(len(codes) - 1, 0))
+    known = codes[order][position] == country_code if len(codes) else np.zeros(len(country_code), dtype=bool)
+    country = np.where(known, nodes['country'][order[position]] if len(codes) else '', '')
+
+    if flows is not None:
+        flows = np.asarray(flows)[tie]
+        exchange = np.where(x_end1[tie], -flows, flows)
+    else:
+        # X-nodes with one tie line in operation
+        x_order = np.argsort(x_codes, kind='stable')
+        x_position = np.minimum(np.searchsorted(x_codes[x_order], x_code), max(len(x_codes) - 1, 0))
+        x_rows = x_order[x_position] if len(x_codes) else np.zeros(0, dtype=np.intp)
+        consumed = np.nan_to_num(x_nodes.column('active_load')) + \
+            np.nan_to_num(x_nodes.column('active_power_generation'))
+        single = np.bincount(x_rows, minlength=len(x_codes))[x_rows] == 1
+        exchange = np.where(single, consumed[x_rows], 0.0)
+        known &= single
+    table = group_by({'country': country[known], 'net_exchange': exchange[known]}, ['country'], ['net_exchange'])
+    del table['count']
+    return table
+
+
+def get_balance(model, flows=None):
+    """
+    Balance of every country with net exchange over tie lines (0 for countries without tie lines)
+    :param flows: array of branch flows in MW or None (see get_net_exchange)
+    :return: dictionary {column name: array}
+    """
+    table = aggregate(model, ('country',), ('active_load', 'generation', 'balance'))
+    exchange = get_net_exchange(model, flows)
+    values = dict(zip(exchange['country'].tolist(), exchange['net_exchange'].tolist()))
+    table['net_exchange'] = np.array([values.get(country, 0.0) for country in table['country'].tolist()])
+    return table
+
+
+def summarize_file(file_path, by=('country',), values=value_columns):
+    """
+    Aggregation of one uct file with its date and time
+    :return: dictionary {column name: array}
+    """
+    model = Ucte(file_path, columnar=True, keep_lines=False)
+    table = aggregate(model, by, values)
+    count = len(table['count'])
+    table['date'] = np.full(count, model.get_date())
+    table['time'] = np.full(count, model.HHMM[:2] + ":" + model.HHMM[2:])
+    return table
+
+
+def concatenate_tables(tables):
+    """
+    :param tables: list of tables with same columns
+    :return: dictionary {column name: array}
+    """
+    if not tables:
+        return {}
+    return {name: np.concatenate([table[name] for table in tables]) for name in tables[0]}
+
+
+def iter_summaries(file_paths, by=('country',), values=value_columns, workers=None, max_pending=None):
+    """
+    Aggregates uct files in worker processes, only tables are sent back, so memory does not grow with number
+    of files. Tables come in order of file timestamps.
+    :param file_paths: glob pattern or list of paths
+    :return: generator of tables with columns 'date' and 'time' added
+    """
+    return iter_map(summarize_file, file_paths, workers, max_pending, by=by, values=values)
+
+
+def aggregate_files(file_paths, by=('country',), values=value_columns, workers=None, max_pending=None):
+    """
+    Table of all files, e.g. hourly balance of countries over a year
+    :return: dictionary {column name: array}
+    """
+    return concatenate_tables(list(iter_summaries(file_paths, by, values, workers, max_pending)))
+
+
+if __name__ == "__main__":
+    obj = Ucte("20200418_0930_FO6_HR1.uct", columnar=True)
+    print(get_balance(obj))
+    print(aggregate(obj, ('country', 'power_plant_type'), ('capacity',)))
+    print(aggregate_files("20200418_*_HR?.uct", ('country', 'voltage'), ('active_load', 'generation')))
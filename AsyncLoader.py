@@ -0,0 +1,69 @@
+import asyncio
+import concurrent.futures
+
+from Ucte import Ucte
+
+
+class AsyncLoader:
+    """
+    Loads uct files from asyncio code without blocking event loop, e.g.:
+        async with AsyncLoader(max_concurrent=4) as loader:
+            model = await loader.load(file_path)
+    File is opened, read and decoded in worker process of executor, only file path is sent to worker and only
+    model is sent back (see BatchLoader). At most max_concurrent files are loaded at the same time, other calls
+    wait. Cancelling task drops result of decoding which already started in worker.
+    max_concurrent: integer
+    executor: executor used for loading (default: own process pool)
+    """
+    def __init__(self, max_concurrent=4, executor=None):
+        """
+        :param max_concurrent: integer (maximum number of files loaded at the same time)
+        :param executor: concurrent.futures.Executor or None (process pool with max_concurrent workers)
+        """
+        self.max_concurrent = max_concurrent
+        self.own_executor = executor is None
+        self.executor = executor or concurrent.futures.ProcessPoolExecutor(max_concurrent)
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def load(self, file_path, columnar=True, keep_lines=True):
+        """
+        :param file_path: string (path to uct file, also compressed file or member of zip archive, see Ucte)
+        :param columnar: boolean (see Ucte, columnar models are cheap to send from worker process)
+        :param keep_lines: boolean (see Ucte)
+        :return: Ucte
+        """
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, Ucte, file_path, columnar, keep_lines)
+
+    def close(self):
+        """
+        Shuts down own process pool
+        """
+        if self.own_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+async def load_ucte(file_path, columnar=True, keep_lines=True):
+    """
+    Loads one uct file without blocking event loop (for many files share one AsyncLoader)
+    :return: Ucte
+    """
+    async with AsyncLoader(max_concurrent=1) as loader:
+        return await loader.load(file_path, columnar, keep_lines)
+
+
+if __name__ == "__main__":
+    async def main():
+        files = ["20200418_0930_FO6_HR1.uct", "20200401_2130_FO3_SI0.uct", "20200419_1430_SN7_HR0.uct"]
+        async with AsyncLoader() as loader:
+            for obj in await asyncio.gather(*(loader.load(file) for file in files)):
+                print(obj.file_name, len(obj.nodes))
+
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+import collections
+import concurrent.futures
+import glob
+import os
+
+from Ucte import Ucte, get_archive_members, parse_file_name
+
+
+def get_file_paths(file_paths):
+    """
+    :param file_paths: glob pattern (e.g. 'D:\\uct\\20200418_*_HR?.uct') or list of paths, zip archives are
+    replaced by their uct files
+    :return: list of paths sorted by timestamp in file name (yyyymmdd, HHMM), then by file name
+    """
+    if isinstance(file_paths, str):
+        file_paths = glob.glob(file_paths)
+    file_paths = [member for file_path in file_paths
+                  for member in (get_archive_members(file_path) if file_path.lower().endswith('.zip') else [file_path])]
+
+    def get_key(file_path):
+        fields = parse_file_name(file_path)
+        return fields['yyyymmdd'], fields['HHMM'], fields['file_name']
+
+    return sorted(file_paths, key=get_key)
+
+
+def iter_map(function, file_paths, workers=None, max_pending=None, **kwargs):
+    """
+    Calls function(file_path, **kwargs) for every uct file in process pool and yields results in order of file
+    timestamps. At most max_pending files are processed ahead of consumer, which bounds memory used by results.
+    :param function: top level function (it is sent to worker processes by pickle)
+    :param file_paths: glob pattern or list of paths
+    :param workers: integer (number of processes, default: number of processors)
+    :param max_pending: integer (default: 2 * workers)
+    :return: generator of results
+    """
+    file_paths = get_file_paths(file_paths)
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        pending = collections.deque()
+        try:
+            for file_path in file_paths:
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(function, file_path, **kwargs))
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iter_batch(file_paths, workers=None, max_pending=None, columnar=True, keep_lines=True):
+    """
+    Parses uct files in process pool and yields models in order of their timestamps (see iter_map).
+    Models are sent from worker processes by pickle, columnar models (default) are much cheaper to send.
+    :param file_paths: glob pattern or list of paths
+    :param workers: integer (number of processes, default: number of processors)
+    :param max_pending: integer (default: 2 * workers)
+    :param columnar: boolean (see Ucte)
+    :param keep_lines: boolean (see Ucte)
+    :return: generator of Ucte objects
+    """
+    return iter_map(Ucte, file_paths, workers, max_pending, columnar=columnar, keep_lines=keep_lines)
+
+
+def load_batch(file_paths, workers=None, max_pending=None, columnar=True, keep_lines=True):
+    """
+    Parses uct files in process pool (see iter_batch)
+    :return: list of Ucte objects sorted by timestamp
+    """
+    return list(iter_batch(file_paths, workers, max_pending, columnar, keep_lines))
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    models = load_batch("20200418_*_HR?.uct")
+    for obj in models:
+        print(obj.get_date(), obj.HHMM, len(obj.nodes))
+    print("%.3f s" % (time.perf_counter() - start))
@@ -0,0 +1,74 @@
+"""
+Benchmarks of uct section decoding and memory used by records, run: python Benchmark.py
+"""
+
+import time
+import tracemalloc
+
+from Node import Node
+from Line import Line
+from NetworkTable import NetworkTable
+
+node_lines = [
+    "HDJALE5  HE Dale      0 2  116.5     0.0     0.0   -10.0     7.0    -6.0   -20.4     7.0   -12.0   0.0 \n",
+    "HDONJM5  Donji Miholj   9  117.0     1.5    -0.4     0.0     0.0 \n",
+    "LSOSTA16 LSOSTA16     0 2  400.8     0.0     0.0  -382.0   -29.8     0.0  -553.0   400.0  -300.0   0.0     0.0"
+    "     0.0     0.0 L\n",
+]
+line_lines = [
+    "HERNES1  XER_PE11 1 8   1.28  13.47   161.48   2001 \n",
+    "HBRINJ2  HVEPAD2  1 0  11.59  60.82   392.46    780 \n",
+    "LBERIC2  LKLECE2  2 1  4.000 53.500  120.000    640 BER-KLE220EQ\n",
+]
+
+
+def get_lines(samples, count):
+    """
+    :return: list of count lines repeating sample lines
+    """
+    return [samples[index % len(samples)] for index in range(count)]
+
+
+def benchmark_decoding(count=100000):
+    """
+    Compares building record objects line by line with vectorized decoding of whole section
+    :param count: integer (number of lines per section)
+    """
+    for cls, samples in ((Node, node_lines), (Line, line_lines)):
+        lines = get_lines(samples, count)
+
+        start = time.perf_counter()
+        records = [cls(line) for line in lines]
+        per_line = time.perf_counter() - start
+
+        start = time.perf_counter()
+        table = NetworkTable.from_lines(cls, lines)
+        vectorized = time.perf_counter() - start
+
+        assert len(records) == len(table)
+        print("%-5s %d lines: per line %.3f s, vectorized %.3f s (%.1fx)"
+              % (cls.__name__, count, per_line, vectorized, per_line / vectorized))
+
+
+def benchmark_memory(count=100000):
+    """
+    Memory used by records of one section: slotted objects with and without their line and columnar table
+    :param count: integer (number of lines per section)
+    """
+    for cls, samples in ((Node, node_lines), (Line, line_lines)):
+        # lines are split inside measurement as they are read from file, so lines which are not kept are freed
+        text = "".join(get_lines(samples, count))
+        for label, load in (("records with line", lambda: [cls(line) for line in text.splitlines(True)]),
+                            ("records without line", lambda: [cls(line, False) for line in text.splitlines(True)]),
+                            ("columnar table", lambda: NetworkTable.from_lines(cls, text.splitlines(True)))):
+            tracemalloc.start()
+            records = load()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del records
+            print("%-5s %-21s %.1f MB per 100k records" % (cls.__name__, label, size / count * 100000 / 1e6))
+
+
+if __name__ == "__main__":
+    benchmark_decoding()
+    benchmark_memory()
@@ -0,0 +1,202 @@
+"""
+DC load flow, PTDF and LODF of Ucte model (requires SciPy). Branch flows are P = b * (angle_from - angle_to - shift),
+with b = 1 / x of branch and shift = phase shift of transformer. Susceptance matrix without slack buses is
+factorized once and factorization is reused for every solve, so many injection vectors and contingencies are
+solved as one batch.
+One slack bus is chosen in every island: node with type code 3 (UCTE slack), otherwise node with largest
+generation. Injection of node is -(active_load + active_power_generation) as generation is negative in uct file.
+"""
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
+
+from YBus import YBus
+
+node_type_slack = 3
+# 1 - PTDF of outaged branch on itself below this value: outage splits island, LODF is not defined
+islanding_tolerance = 1e-9
+
+
+class DcLoadFlow:
+    """
+    ybus: YBus (buses and branches of model)
+    used: array of indexes of branches in operation (into ybus.branches)
+    susceptance: array (b of used branches, per unit)
+    shift: array (phase shift of used branches, radians)
+    islands: array (island number of every bus)
+    slack: array of slack bus indexes (one per island)
+    """
+    def __init__(self, model, s_base=100.0, coupler_x=1e-4):
+        """
+        :param model: Ucte (any mode, columnar is fastest)
+        :param s_base: float (MVA)
+        :param coupler_x: float (reactance of busbar couplers in per unit)
+        """
+        self.model = model
+        self.ybus = YBus(model, s_base, coupler_x)
+        branches = self.ybus.branches
+        self.used = np.flatnonzero(branches.in_operation)
+        self.susceptance = 1 / np.imag(1 / branches.series[self.used])
+        self.shift = np.angle(branches.ratio[self.used])
+        self.bus_from = branches.bus_from[self.used]
+        self.bus_to = branches.bus_to[self.used]
+        size = len(self.ybus.codes)
+
+        adjacency = scipy.sparse.coo_matrix((np.ones(len(self.used)), (self.bus_from, self.bus_to)),
+                                            shape=(size, size))
+        island_count, self.islands = scipy.sparse.csgraph.connected_components(adjacency, directed=False)
+        self.slack = self.get_slack_buses(island_count)
+
+        # incidence matrix of used branches and susceptance matrix without slack buses
+        count = len(self.used)
+        rows = np.concatenate([np.arange(count), np.arange(count)])
+        self.incidence = scipy.sparse.csr_matrix((np.concatenate([np.ones(count), -np.ones(count)]),
+                                                  (rows, np.concatenate([self.bus_from, self.bus_to]))),
+                                                 shape=(count, size))
+        matrix = (self.incidence.T @ scipy.sparse.diags(self.susceptance) @ self.incidence).tocsc()
+        self.reduced = np.ones(size, dtype=bool)
+        self.reduced[self.slack] = False
+        self.reduced_buses = np.flatnonzero(self.reduced)
+        reduced_matrix = matrix[self.reduced_buses][:, self.reduced_buses].tocsc()
+        self.factor = scipy.sparse.linalg.splu(reduced_matrix) if len(self.reduced_buses) else None
+
+    def get_slack_buses(self, island_count):
+        """
+        :return: array of slack bus of every island
+        """
+        nodes = self.ybus.nodes
+        generation = np.abs(np.nan_to_num(nodes.column('active_power_generation')))
+        priority = (nodes.column('type_code') == node_type_slack) * (generation.max(initial=0) + 1) + generation
+        order = np.lexsort((-priority, self.islands))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = self.islands[order[1:]] != self.islands[order[:-1]]
+        return order[first]
+
+    def get_injections(self):
+        """
+        Injections of nodes of model when DcLoadFlow was created (bus table of ybus)
+        :return: array of active power injected to every bus (MW)
+        """
+        nodes = self.ybus.nodes
+        return -(np.nan_to_num(nodes.column('active_load')) + np.nan_to_num(nodes.column('active_power_generation')))
+
+    def solve_angles(self, right_side):
+        """
+        :param right_side: array (buses) or 2-D array (buses x cases) in per unit
+        :return: array of bus voltage angles (radians), 0 for slack buses
+        """
+        angles = np.zeros(right_side.shape)
+        if self.factor is not None:
+            # SuperLU solves columns of Fortran ordered array in place of copying them
+            angles[self.reduced_buses] = self.factor.solve(np.asfortranarray(right_side[self.reduced_buses]))
+        return angles
+
+    def solve(self, injections=None):
+        """
+        DC load flow, slack bus of every island takes mismatch of its island
+        :param injections: array of bus injections (MW) or 2-D array (buses x cases), default: get_injections
+        :return: tuple (angles in radians, flows of all branches in MW from node1 to node2, 0 when out of operation)
+        """
+        injections = self.get_injections() if injections is None else np.asarray(injections, dtype=float)
+        s_base = self.ybus.s_base
+        # phase shifters act as pair of injections
+        shift_flows = self.susceptance * self.shift
+        right_side = injections / s_base
+        right_side = right_side + (self.incidence.T @ shift_flows if injections.ndim == 1 else
+                                   (self.incidence.T @ shift_flows)[:, np.newaxis])
+        angles = self.solve_angles(right_side)
+        used_flows = self.susceptance.reshape(-1, *([1] * (injections.ndim - 1))) * \
+            (self.incidence @ angles - (self.shift if injections.ndim == 1 else self.shift[:, np.newaxis])) * s_base
+        flows = np.zeros((len(self.ybus.branches),) + injections.shape[1:])
+        flows[self.used] = used_flows
+        return angles, flows
+
+    def get_used(self, branches):
+        """
+        :param branches: array of branch indexes (into ybus.branches) or None (all branches in operation)
+        :return: array of positions in used branches
+        """
+        if branches is None:
+            return np.arange(len(self.used))
+        positions = np.full(len(self.ybus.branches), -1)
+        positions[self.used] = np.arange(len(self.used))
+        output = positions[np.asarray(branches)]
+        if (output < 0).any():
+            raise ValueError("branch is out of operation")
+        return output
+
+    def get_branch(self, node1, node2, order_code):
+        """
+        :return: integer (index of branch in ybus.branches)
+        """
+        return self.ybus.branches.keys.index((node1.encode('latin-1'), node2.encode('latin-1'), order_code))
+
+    def get_ptdf(self, monitored=None):
+        """
+        Power transfer distribution factors: change of flow on branch for 1 MW injected at bus and taken at slack
+        bus of its island
+        :param monitored: array of branch indexes (default: all branches in operation)
+        :return: 2-D array (monitored branches x buses)
+        """
+        positions = self.get_used(monitored)
+        # PTDF = diag(b) A B^-1, solved as B^-1 (A^T diag(b)) since B is symmetric
+        right_side = (self.incidence[positions].T @ scipy.sparse.diags(self.susceptance[positions])).toarray()
+        return self.solve_angles(right_side).T
+
+    def get_lodf(self, outages=None, monitored=None):
+        """
+        Line outage distribution factors: change of flow on monitored branch per 1 MW of flow of outaged branch
+        before its outage. Outage which splits island gives NaN.
+        :param outages: array of branch indexes (default: all branches in operation)
+        :param monitored: array of branch indexes (default: all branches in operation)
+        :return: 2-D array (monitored branches x outages)
+        """
+        outage_positions = self.get_used(outages)
+        monitored_positions = self.get_used(monitored)
+        # flows caused by 1 per unit transfer between ends of outaged branches
+        outage_incidence = self.incidence[outage_positions]
+        angles = self.solve_angles(outage_incidence.T.toarray())
+        own = (outage_incidence @ angles)[np.arange(len(outage_positions)), np.arange(len(outage_positions))] * \
+            self.susceptance[outage_positions]
+        transfer = self.incidence[monitored_positions] @ angles * self.susceptance[monitored_positions, np.newaxis]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lodf = transfer / (1 - own)
+        lodf[:, np.abs(1 - own) < islanding_tolerance] = np.nan
+        # monitored branch which is outaged loses its whole flow
+        same = monitored_positions[:, np.newaxis] == outage_positions[np.newaxis, :]
+        lodf[same] = -1
+        return lodf
+
+    def run_contingencies(self, outages=None, monitored=None, injections=None, batch_size=256):
+        """
+        N-1 analysis: flows of monitored branches after outage of each branch. Outages are solved in batches of
+        batch_size with one call of factorization per batch.
+        :param outages: array of branch indexes (default: all branches in operation)
+        :param monitored: array of branch indexes (default: all branches in operation)
+        :param injections: array of bus injections in MW (default: get_injections)
+        :param batch_size: integer (outages per batch, bounds memory used by dense intermediate arrays)
+        :return: 2-D array of flows in MW (monitored branches x outages), NaN for outages which split island
+        """
+        angles, flows = self.solve(injections)
+        outages = self.used if outages is None else np.asarray(outages)
+        monitored = self.used if monitored is None else np.asarray(monitored)
+        output = np.empty((len(monitored), len(outages)))
+        for start in range(0, len(outages), batch_size):
+            batch = outages[start:start + batch_size]
+            lodf = self.get_lodf(batch, monitored)
+            output[:, start:start + batch_size] = flows[monitored][:, np.newaxis] + lodf * flows[batch][np.newaxis, :]
+        return output
+
+
+if __name__ == "__main__":
+    import time
+    from Ucte import Ucte
+
+    obj = Ucte("20200418_0930_FO6_HR1.uct", columnar=True)
+    engine = DcLoadFlow(obj)
+    angles, flows = engine.solve()
+    start = time.perf_counter()
+    result = engine.run_contingencies()
+    print(result.shape, "%.3f s" % (time.perf_counter() - start))
@@ -0,0 +1,109 @@
+import io
+
+import numpy as np
+
+from Record import encoding, encoding_errors
+
+
+class LazySection:
+    """
+    Section of uct file whose records are built only when section is first iterated or indexed.
+    Records are created lazily, their fields are decoded on first access.
+    cls: record class of section
+    text: content of uct file (string, or mmap of file whose records get memoryview slices as lines)
+    ranges: list of (start, stop) offsets of section lines in text
+    parts: list of LazySection objects whose records are joined in this section (instead of text and ranges)
+    """
+    def __init__(self, cls, text, ranges, parts=None):
+        """
+        :param cls: record class (Node, Line, Transformer, TransformerRegulation or TransformerSpecParam)
+        :param text: string (content of uct file) or mmap
+        :param ranges: list of tuples (start, stop)
+        :param parts: list of LazySection objects or None
+        """
+        self.cls = cls
+        self.text = text
+        self.ranges = ranges
+        self.parts = parts
+        self.records = None
+
+    @classmethod
+    def concatenate(cls, record_cls, sections):
+        """
+        Joins sections of same record class (e.g. node blocks of all countries), records are shared with sections
+        :return: LazySection
+        """
+        return cls(record_cls, None, [], sections)
+
+    def get_records(self):
+        """
+        Builds records of section on first call
+        :return: list of records
+        """
+        if self.records is None and self.parts is not None:
+            self.records = [record for part in self.parts for record in part.get_records()]
+        elif self.records is None:
+            self.records = [self.cls(line, lazy=True) for line in self.get_lines()]
+        return self.records
+
+    def get_lines(self):
+        """
+        :return: list of strings (lines of section)
+        """
+        if isinstance(self.text, str):
+            return [line for start, stop in self.ranges for line in io.StringIO(self.text[start:stop])]
+
+        # memory-mapped file, lines are slices of the map and nothing is copied
+        view = memoryview(self.text)
+        lines = []
+        for start, stop in self.ranges:
+            position = start
+            while position < stop:
+                end = self.text.find(b"\n", position, stop)
+                end = stop if end == -1 else end + 1
+                lines.append(view[position:end])
+                position = end
+        return lines
+
+    def get_unread_lines(self):
+        """
+        Lines of section as strings when its records were not built yet (lines then still give values of section)
+        :return: list of strings or None (records were built and may be changed)
+        """
+        if self.records is not None:
+            return None
+        if self.parts is not None:
+            lines = []
+            for part in self.parts:
+                part_lines = part.get_unread_lines()
+                if part_lines is None:
+                    return None
+                lines.extend(part_lines)
+            return lines
+        if isinstance(self.text, str):
+            return self.get_lines()
+        return [line for start, stop in self.ranges for line in io.StringIO(self.text[start:stop].decode(encoding, encoding_errors))]
+
+    def __len__(self):
+        if self.records is not None:
+            return len(self.records)
+        elif self.parts is not None:
+            return sum(len(part) for part in self.parts)
+        newline = "\n" if isinstance(self.text, str) else ord("\n")
+        count = 0
+        for start, stop in self.ranges:
+            if isinstance(self.text, str):
+                count += self.text.count(newline, start, stop)
+            else:
+                # mmap has no count method, new lines are counted in array viewing the map (nothing is copied)
+                count += int(np.count_nonzero(np.frombuffer(self.text, np.uint8, stop - start, start) == newline))
+            # last line of file without new line
+            if stop > start and self.text[stop - 1] != newline:
+                count += 1
+        return count
+
+    def __iter__(self):
+        return iter(self.get_records())
+
+    def __getitem__(self, index):
+        return self.get_records()[index]
@@ -1,84 +1,32 @@
-class Line:
-    def __init__(self, line_line):
-        """
-        :param line_line: line of uct file contaning line
-        """
-        self.line = line_line
-        self.node1 = self.line[0:8]
-        self.node2 = self.line[9:17]
-        self.order_code = self.line[18]
-        self.status = self.__get_status()
-        self.resistance_r = self.__get_resistance_r()
-        self.resistance_x = self.__get_resistance_x()
-        self.susceptance = self.__get_susceptance()
-        self.current_limit = self.__get_current_limit()
-        self.element_name = self.__get_element_name()
-
-    def __get_status(self):
-        """
-        0: real element IN operation        (R, X only positive values permitted)
-        8: real element OUT of operation    (R, X only positive values permitted)
-        1: equivalent element IN operation
-        9: equivalent element OUT of operation
-        2: busbar coupler IN operation      (definition: R=0, X=0, B=0)
-        7: busbar coupler OUT of operation  (definition: R=0, X=0, B=0)
-        :return: integer
-        """
-        try:
-            return int(self.line[20])
-        except ValueError:
-            return None
-
-    def __get_resistance_r(self):
-        """
-        R (Ω)
-        :return: float
-        """
-        try:
-            return float(self.line[22:28])
-        except ValueError:
-            return None
-
-    def __get_resistance_x(self):
-        """
-        X (Ω)
-        the absolute value of the reactance for lines has to be greater than or equal to 0.050 Ω
-        (to avoid division by values near zero in load flow calculation)
-        :return: float
-        """
-        try:
-            return float(self.line[29:35])
-        except ValueError:
-            return None
-
-    def __get_susceptance(self):
-        """
-        B (µS)
-        :return: float
-        """
-        try:
-            return float(self.line[36:44])
-        except ValueError:
-            return None
-
-    def __get_current_limit(self):
-        """
-        I (A)
-        :return: integer
-        """
-        try:
-            return int(self.line[45:51])
-        except ValueError:
-            return None
-
-    def __get_element_name(self):
-        """
-        :return: string
-        """
-        try:
-            return self.line[52:64]
-        except ValueError:
-            return None
+from Record import Record
+
+
+class Line(Record):
+    # (attribute, first column, last column + 1, type) of every field in record line
+    fields = (
+        ('node1', 0, 8, str),
+        ('node2', 9, 17, str),
+        ('order_code', 18, 19, str),
+        # 0: real element IN operation        (R, X only positive values permitted)
+        # 8: real element OUT of operation    (R, X only positive values permitted)
+        # 1: equivalent element IN operation
+        # 9: equivalent element OUT of operation
+        # 2: busbar coupler IN operation      (definition: R=0, X=0, B=0)
+        # 7: busbar coupler OUT of operation  (definition: R=0, X=0, B=0)
+        ('status', 20, 21, int),
+        # R (Ω)
+        ('resistance_r', 22, 28, float),
+        # X (Ω)
+        # the absolute value of the reactance for lines has to be greater than or equal to 0.050 Ω
+        # (to avoid division by values near zero in load flow calculation)
+        ('resistance_x', 29, 35, float),
+        # B (µS)
+        ('susceptance', 36, 44, float),
+        # I (A)
+        ('current_limit', 45, 51, int),
+        ('element_name', 52, 64, str),
+    )
+    __slots__ = ('line',) + tuple(name for name, start, stop, kind in fields)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+"""
+On-disk cache of parsed Ucte models: every uct file is parsed once and later loads unpickle the model. Entries are
+keyed by file path, file state, load options and cache format, so changed files and entries written by other
+versions of the reader are parsed again instead of being loaded.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from Ucte import Ucte, section_classes, split_archive_path
+
+# part of entry key, increased when pickled form of models changes: records are restored by filling their slots
+# by position (see Record.restore_record), so entries of other record layout must not be loaded
+cache_format_version = 2
+
+
+def get_content_hash(file_path):
+    """
+    :param file_path: string (members of zip archive give hash of archive)
+    :return: string (SHA-1 of file content)
+    """
+    content_hash = hashlib.sha1()
+    with open(split_archive_path(file_path)[0], "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            content_hash.update(block)
+    return content_hash.hexdigest()
+
+
+class ModelCache:
+    """
+    On-disk cache of parsed Ucte models, so files which were already parsed are loaded from compact binary form
+    (pickle) instead of parsing text again. Columnar models (default) are stored as NumPy arrays and load in
+    milliseconds, models of record objects are cached too but unpickling every record is much slower.
+    Entry is found by absolute file path, size, modification time and load options. Content hash of file is stored
+    in entry and checked when loading with verify=True.
+    Least recently used entries are removed when total size of cache is above max_size.
+    directory: directory of cache files
+    max_size: integer (bytes)
+    """
+    extension = ".ucte.pickle"
+
+    def __init__(self, directory, max_size=2 * 1024 ** 3):
+        """
+        :param directory: string (created if it does not exist)
+        :param max_size: integer (maximum total size of cache files in bytes)
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def get_entry_path(self, file_path, options):
+        """
+        Entry file name is hash of file path followed by hash of size, modification time, options, cache format
+        version and slots of record classes
+        :return: string
+        """
+        file_path = os.path.abspath(file_path)
+        # members of zip archive are checked by size and modification time of archive
+        stat = os.stat(split_archive_path(file_path)[0])
+        path_hash = hashlib.sha1(file_path.encode()).hexdigest()[:16]
+        layout = [cls.__slots__ for cls in section_classes.values()]
+        state = repr((stat.st_size, stat.st_mtime_ns, sorted(options.items()), cache_format_version, layout))
+        state_hash = hashlib.sha1(state.encode()).hexdigest()[:16]
+        return os.path.join(self.directory, path_hash + "_" + state_hash + self.extension)
+
+    def load(self, file_path, verify=False, columnar=True, keep_lines=True):
+        """
+        Returns model from cache or parses file and stores it in cache (lazy and memory map models can not be cached)
+        :param file_path: string (path to uct file)
+        :param verify: boolean (True: content hash of file is compared with cached entry)
+        :param columnar: boolean (see Ucte)
+        :param keep_lines: boolean (see Ucte)
+        :return: Ucte
+        """
+        options = {'columnar': columnar, 'keep_lines': keep_lines}
+        entry_path = self.get_entry_path(file_path, options)
+        try:
+            with open(entry_path, "rb") as handle:
+                content_hash, model = pickle.load(handle)
+        except Exception:
+            # missing, truncated or incompatible entry (unpickling may raise almost any exception) is a miss
+            pass
+        else:
+            if not verify or content_hash == get_content_hash(file_path):
+                # modification time of entry is time of last use
+                os.utime(entry_path)
+                return model
+            os.remove(entry_path)
+
+        model = Ucte(file_path, **options)
+        self.store(entry_path, get_content_hash(file_path), model)
+        return model
+
+    def store(self, entry_path, content_hash, model):
+        """
+        Writes entry atomically and removes least recently used entries above max_size
+        """
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as output:
+                pickle.dump((content_hash, model), output, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, entry_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        self.evict()
+
+    def get_entries(self):
+        """
+        :return: list of tuples (last use time, size, path) of cache entries
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.extension):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def get_size(self):
+        """
+        :return: integer (total size of cache entries in bytes)
+        """
+        return sum(size for last_use, size, path in self.get_entries())
+
+    def evict(self):
+        """
+        Removes least recently used entries until total size is not above max_size
+        """
+        entries = sorted(self.get_entries())
+        total = sum(size for last_use, size, path in entries)
+        for last_use, size, path in entries:
+            if total <= self.max_size:
+                break
+            os.remove(path)
+            total -= size
+
+    def invalidate(self, file_path):
+        """
+        Removes all entries of uct file (every version and load options)
+        :param file_path: string
+        """
+        prefix = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:16] + "_"
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(self.extension):
+                os.remove(os.path.join(self.directory, name))
+
+    def clear(self):
+        """
+        Removes all entries
+        """
+        for last_use, size, path in self.get_entries():
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    import time
+
+    cache = ModelCache("ucte_cache")
+    for attempt in range(2):
+        start = time.perf_counter()
+        obj = cache.load("20200418_0930_FO6_HR1.uct")
+        print(obj.file_name, len(obj.nodes), "%.3f s" % (time.perf_counter() - start))
@@ -0,0 +1,332 @@
+"""
+Columnar alternative to lists of record objects: every section of uct file is stored as one NumPy array per field.
+float64 for electrical values (NaN when missing), int8 for status and type codes (-1 when missing),
+8 byte strings for node codes (non-ASCII characters stored as '?') and fixed width strings for names.
+"""
+
+import numpy as np
+
+from LazySection import LazySection
+from Record import encoding, encoding_errors
+
+node_code_fields = ('code', 'node1', 'node2')
+
+
+def get_dtype(name, start, stop, kind):
+    """
+    :return: NumPy dtype of column for field of record class
+    """
+    if name in node_code_fields:
+        return np.dtype('S8')
+    elif kind is str:
+        return np.dtype('U%d' % (stop - start))
+    elif kind is int and stop - start == 1:
+        return np.dtype(np.int8)
+    return np.dtype(np.float64)
+
+
+def get_missing(dtype):
+    """
+    :return: value stored in column of given dtype instead of None
+    """
+    if dtype.kind == 'i':
+        return -1
+    elif dtype.kind == 'f':
+        return np.nan
+    return ''
+
+
+def decode_numbers(chars, kind):
+    """
+    Decodes fixed width numbers ('  -12.5 ') of one field for all lines without converting strings.
+    Characters of field are scanned left to right, each step for all lines at once: digits are accumulated into
+    integer mantissa which is divided by power of ten. Fields not in this simple form (e.g. exponent) are
+    converted one by one.
+    :param chars: 2-D array of ASCII codes (one row per character of field, one column per line)
+    :param kind: int or float
+    :return: float64 array, NaN for blank or invalid fields
+    """
+    count = chars.shape[1]
+    mantissa = np.zeros(count)
+    decimals = np.zeros(count, dtype=np.int8)
+    started = np.zeros(count, dtype=bool)
+    ended = np.zeros(count, dtype=bool)
+    negative = np.zeros(count, dtype=bool)
+    seen_digit = np.zeros(count, dtype=bool)
+    seen_dot = np.zeros(count, dtype=bool)
+    invalid = np.zeros(count, dtype=bool)
+    for char in chars:
+        space = (char == ord(' ')) | (char == 0)
+        value = char - np.uint8(ord('0'))
+        digit = value < 10
+        dot = char == ord('.')
+        minus = char == ord('-')
+        sign = minus | (char == ord('+'))
+        invalid |= ~(space | digit | dot | sign)
+        invalid |= ended & ~space
+        invalid |= sign & started
+        invalid |= dot & seen_dot
+        ended |= started & space
+        started |= ~space
+        mantissa *= np.where(digit, 10.0, 1.0)
+        mantissa += value * digit
+        decimals += digit & seen_dot
+        seen_dot |= dot
+        seen_digit |= digit
+        negative |= minus
+
+    simple = seen_digit & ~invalid
+    if kind is int:
+        simple &= ~seen_dot
+    column = np.where(negative, -mantissa, mantissa) / 10.0 ** decimals
+    column[~simple] = np.nan
+
+    for index in np.flatnonzero(started & ~simple):
+        try:
+            column[index] = kind(chars[:, index].tobytes().decode('latin-1').strip('\0'))
+        except (ValueError, OverflowError):
+            pass
+    return column
+
+
+def decode_lines(lines, fields):
+    """
+    Decodes fields of all lines of one section: lines are padded to record width and viewed as 2-D array of
+    characters, so every field is converted for the whole section in one step
+    :param lines: list of strings (lines of uct file)
+    :param fields: fields of record class
+    :return: dictionary {attribute: array}
+    """
+    width = max(stop for name, start, stop, kind in fields)
+    chars = np.array(lines, dtype='U%d' % width).view(np.uint32).reshape(len(lines), width)
+
+    columns = {}
+    for name, start, stop, kind in fields:
+        dtype = get_dtype(name, start, stop, kind)
+        block = chars[:, start:stop]
+        if dtype.kind == 'U':
+            block = block.copy()
+            block[(block == ord('\n')) | (block == ord('\r'))] = 0
+            columns[name] = block.view(dtype).ravel()
+            continue
+        # ASCII codes, other characters are replaced by 127 which is not part of any number or node code
+        block = np.minimum(block, 127).astype(np.uint8)
+        block[(block == ord('\n')) | (block == ord('\r'))] = 0
+        if dtype.kind == 'S':
+            block[block == 127] = ord('?')
+            columns[name] = block.view(dtype).ravel()
+        elif dtype.kind == 'i':
+            value = block[:, 0] - np.uint8(ord('0'))
+            columns[name] = np.where(value < 10, value, -1).astype(dtype)
+        else:
+            columns[name] = decode_numbers(block.T.copy(), kind)
+    return columns
+
+
+def encode_lines(lines):
+    """
+    :param lines: list of strings or bytes-like objects (memoryview of memory-mapped file)
+    :return: array of lines as bytes of uct file (with their new line)
+    """
+    return np.array([line.encode(encoding, encoding_errors) if isinstance(line, str) else bytes(line)
+                     for line in lines], dtype=bytes)
+
+
+def encode_values(values, dtype):
+    """
+    :param values: list of field values of records (None when missing)
+    :return: array of dtype (missing values stored as get_missing)
+    """
+    missing = get_missing(dtype)
+    if dtype.kind == 'S':
+        values = [missing if value is None else value.encode('ascii', 'replace') for value in values]
+    else:
+        values = [missing if value is None else value for value in values]
+    return np.array(values, dtype=dtype)
+
+
+class NetworkTable:
+    """
+    cls: record class of section (Node, Line, Transformer, TransformerRegulation or TransformerSpecParam)
+    columns: dictionary {attribute: array}, one array per field of cls
+    lines: array of original lines of rows (bytes of uct file, written again when values of row are not changed,
+    see UcteWriter.format_table) or None
+    Iterating or indexing gives TableRow objects with same attributes as objects of cls.
+    """
+    def __init__(self, cls, columns, lines=None):
+        """
+        :param cls: record class
+        :param columns: dictionary {attribute: array}
+        :param lines: array of bytes (one line per row) or None
+        """
+        self.cls = cls
+        self.columns = columns
+        self.lines = lines
+        self.kinds = {name: kind for name, start, stop, kind in cls.fields}
+
+    @classmethod
+    def from_lines(cls, record_cls, lines, keep_lines=False):
+        """
+        :param record_cls: record class of section
+        :param lines: list of strings (lines of uct file)
+        :param keep_lines: boolean (True: lines are kept, so rows are written back unchanged)
+        :return: NetworkTable
+        """
+        return cls(record_cls, decode_lines(lines, record_cls.fields), encode_lines(lines) if keep_lines else None)
+
+    @classmethod
+    def from_records(cls, record_cls, records, keep_lines=False):
+        """
+        :param record_cls: record class of section
+        :param records: list of records, LazySection or NetworkTable (returned as it is)
+        :param keep_lines: boolean (True: lines of records are kept when every record has line)
+        :return: NetworkTable
+        """
+        if isinstance(records, NetworkTable):
+            return records
+        if isinstance(records, LazySection):
+            # section which was not iterated yet is decoded from its lines without building records
+            lines = records.get_unread_lines()
+            if lines is not None:
+                return cls.from_lines(record_cls, lines, keep_lines)
+        records = list(records)
+        lines = None
+        if keep_lines:
+            # slot is read directly, lazy records are not decoded and TableRow gives line of its table
+            lines = [getattr(record, 'line', None) for record in records]
+            lines = encode_lines(lines) if None not in lines else None
+        return cls(record_cls, {name: encode_values([getattr(record, name) for record in records],
+                                                    get_dtype(name, start, stop, kind))
+                                for name, start, stop, kind in record_cls.fields}, lines)
+
+    @classmethod
+    def concatenate(cls, record_cls, tables):
+        """
+        Joins tables of same record class (e.g. node blocks of all countries), lines are kept when every table
+        which is not empty has them
+        :return: NetworkTable
+        """
+        if not tables:
+            return cls.from_lines(record_cls, [])
+        lines = [table.lines for table in tables if len(table)]
+        if lines and all(part is not None for part in lines):
+            lines = np.concatenate(lines)
+        else:
+            lines = None
+        return cls(record_cls, {name: np.concatenate([table.columns[name] for table in tables])
+                                for name in tables[0].columns}, lines)
+
+    def select(self, rows):
+        """
+        :param rows: slice, boolean or index array
+        :return: NetworkTable with selected rows (and their lines)
+        """
+        return NetworkTable(self.cls, {name: column[rows] for name, column in self.columns.items()},
+                            None if self.lines is None else self.lines[rows])
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield TableRow(self, index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.select(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("NetworkTable index out of range")
+        return TableRow(self, index)
+
+    def column(self, name):
+        """
+        :param name: attribute of record class (e.g. 'active_load')
+        :return: array
+        """
+        return self.columns[name]
+
+    def get_value(self, name, index):
+        """
+        Returns value of one field as record class would (None instead of NaN/-1)
+        """
+        column = self.columns[name]
+        value = column[index]
+        kind = self.kinds[name]
+        if kind is str:
+            if isinstance(value, bytes):
+                return value.decode('latin-1')
+            # single character fields (e.g. power plant type) are None when line is too short
+            return None if value == '' and column.itemsize == 4 else str(value)
+        elif column.dtype.kind == 'i':
+            return None if value == -1 else int(value)
+        elif kind is int:
+            return None if value != value else int(value)
+        return None if value != value else float(value)
+
+    def values(self, name):
+        """
+        Returns values of one field for all rows as record class would (faster than get_value for every row)
+        :param name: attribute of record class
+        :return: list
+        """
+        column = self.columns[name]
+        kind = self.kinds[name]
+        values = column.tolist()
+        if column.dtype.kind == 'S':
+            return [value.decode('latin-1') for value in values]
+        elif kind is str:
+            return [None if value == '' else value for value in values] if column.itemsize == 4 else values
+        elif column.dtype.kind == 'i':
+            return [None if value == -1 else value for value in values]
+        elif kind is int:
+            return [None if value != value else int(value) for value in values]
+        return [None if value != value else value for value in values]
+
+    def nbytes(self):
+        """
+        :return: integer (memory used by arrays)
+        """
+        return sum(column.nbytes for column in self.columns.values()) + (0 if self.lines is None else self.lines.nbytes)
+
+
+class TableRow:
+    """
+    View of one row of NetworkTable, compatible with record objects for reading attributes
+    """
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def line(self):
+        """
+        :return: string (line of uct file row was read from) or None
+        """
+        lines = self.table.lines
+        return None if lines is None else lines[self.index].decode(encoding, encoding_errors)
+
+    def __getattr__(self, name):
+        try:
+            return self.table.get_value(name, self.index)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        return "TableRow(%s, %d)" % (self.table.cls.__name__, self.index)
+
+
+if __name__ == "__main__":
+    from Node import Node
+
+    line1 = "HDJALE5  HE Dale      0 2  116.5     0.0     0.0   -10.0     7.0    -6.0   -20.4     7.0   -12.0   0.0 "
+    line2 = "HDONJM5  Donji Miholj   9  117.0     1.5    -0.4     0.0     0.0 "
+    line3 = "LSOSTA16 LSOSTA16     0 2  400.8     0.0     0.0  -382.0   -29.8     0.0  -553.0   400.0  -300.0   0.0     0.0     0.0     0.0 L"
+    table = NetworkTable.from_lines(Node, [line1, line2, line3])
+
+    for row in table:
+        print(row.code, row.status, row.voltage, row.power_plant_type)
+    print(table.column('active_power_generation').sum(), table.nbytes())
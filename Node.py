@@ -1,199 +1,41 @@
-class Node:
-    def __init__(self, node_line):
-        """
-        :param node_line: line of uct file contaning node
-        """
-        self.line = node_line
-        self.code = self.line[0:8]
-        self.geographical_name = self.line[9:21]
-        self.status = self.__get_status()
-        self.type_code = self.__get_type_code()
-        self.voltage = self.__get_voltage()
-        self.active_load = self.__get_active_load()
-        self.reactive_load = self.__get_reactive_load()
-        self.active_power_generation = self.__get_active_power_generation()
-        self.reactive_power_generation = self.__get_reactive_power_generation()
-        self.minimum_permissible_generation_mw = self.__get_minimum_permissible_generation_mw()
-        self.maximum_permissible_generation_mw = self.__get_maximum_permissible_generation_mw()
-        self.minimum_permissible_generation_mvar = self.__get_minimum_permissible_generation_mvar()
-        self.maximum_permissible_generation_mvar = self.__get_maximum_permissible_generation_mvar()
-        self.static_of_primary_control = self.__get_static_of_primary_control()
-        self.nominal_power_of_primary_control = self.__get_nominal_power_for_primary_control()
-        self.three_phase_short_circuit_power = self.__get_three_phase_short_circuit_power()
-        self.x_div_r_ratio = self.__get_three_phase_short_circuit_power()
-        self.power_plant_type = self.__get_power_plant_type()
-
-    def __get_status(self):
-        """
-        0 = real
-        1 = equivalent
-        :return: integer
-        """
-        try:
-            return int(self.line[22])
-        except ValueError:
-            return None
-
-    def __get_type_code(self):
-        """
-        0 = P and Q constant (PQ node)
-        1 = Q and θ constant
-        2 = P and U constant (PU node)
-        3 = U and θ constant (global slack node, only one in the whole network)
-        :return: integer
-        """
-        try:
-            return int(self.line[24])
-        except ValueError:
-            return None
-
-    def __get_voltage(self):
-        """
-        reference value, 0 not allowed
-        (kV)
-        :return: float
-        """
-        try:
-            return float(self.line[26:32])
-        except ValueError:
-            return None
-
-    def __get_active_load(self):
-        """
-        (MW)
-        :return: float
-        """
-        try:
-            return float(self.line[33:40])
-        except ValueError:
-            return None
-
-    def __get_reactive_load(self):
-        """
-        (MVar)
-        :return: float
-        """
-        try:
-            return float(self.line[41:48])
-        except ValueError:
-            return None
-
-    def __get_active_power_generation(self):
-        """
-        (MW)
-        :return: float
-        """
-        try:
-            return float(self.line[49:56])
-        except ValueError:
-            return None
-
-    def __get_reactive_power_generation(self):
-        """
-        (MVar)
-        :return: float
-        """
-        try:
-            return float(self.line[57:64])
-        except ValueError:
-            return None
-
-    def __get_minimum_permissible_generation_mw(self):
-        """
-        (MW)
-        :return: float
-        """
-        try:
-            return float(self.line[65:72])
-        except ValueError:
-            return None
-
-    def __get_maximum_permissible_generation_mw(self):
-        """
-        (MW)
-        :return: float
-        """
-        try:
-            return float(self.line[73:80])
-        except ValueError:
-            return None
-
-    def __get_minimum_permissible_generation_mvar(self):
-        """
-        (MVar)
-        :return: float
-        """
-        try:
-            return float(self.line[81:88])
-        except ValueError:
-            return None
-
-    def __get_maximum_permissible_generation_mvar(self):
-        """
-        (MVar)
-        :return: float
-        """
-        try:
-            return float(self.line[89:96])
-        except ValueError:
-            return None
-
-    def __get_static_of_primary_control(self):
-        """
-        (%)
-        :return: float
-        """
-        try:
-            return float(self.line[97:102])
-        except ValueError:
-            return None
-
-    def __get_nominal_power_for_primary_control(self):
-        """
-        (MW)
-        :return: float
-        """
-        try:
-            return float(self.line[103:110])
-        except ValueError:
-            return None
-
-    def __get_three_phase_short_circuit_power(self):
-        """
-        (MVA)
-        :return: float
-        """
-        try:
-            return float(self.line[111:118])
-        except ValueError:
-            return None
-
-    def __get_x_div_r_ratio(self):
-        """
-        ()
-        :return: float
-        """
-        try:
-            return float(self.line[119:126])
-        except ValueError:
-            return None
-
-    def __get_power_plant_type(self):
-        """
-        H: hydro
-        N: nuclear
-        L: lignite
-        C: hard coal
-        G: gas
-        O: oil
-        W: wind
-        F: further
-        :return: string
-        """
-        try:
-            return self.line[127]
-        except IndexError:
-            return None
+from Record import Record
+
+
+class Node(Record):
+    # (attribute, first column, last column + 1, type) of every field in record line
+    fields = (
+        ('code', 0, 8, str),
+        ('geographical_name', 9, 21, str),
+        # 0 = real, 1 = equivalent
+        ('status', 22, 23, int),
+        # 0 = P and Q constant (PQ node)
+        # 1 = Q and θ constant
+        # 2 = P and U constant (PU node)
+        # 3 = U and θ constant (global slack node, only one in the whole network)
+        ('type_code', 24, 25, int),
+        # reference value, 0 not allowed (kV)
+        ('voltage', 26, 32, float),
+        # loads and generation in MW and MVar, generation limits in MW and MVar
+        ('active_load', 33, 40, float),
+        ('reactive_load', 41, 48, float),
+        ('active_power_generation', 49, 56, float),
+        ('reactive_power_generation', 57, 64, float),
+        ('minimum_permissible_generation_mw', 65, 72, float),
+        ('maximum_permissible_generation_mw', 73, 80, float),
+        ('minimum_permissible_generation_mvar', 81, 88, float),
+        ('maximum_permissible_generation_mvar', 89, 96, float),
+        # (%)
+        ('static_of_primary_control', 97, 102, float),
+        # (MW)
+        ('nominal_power_of_primary_control', 103, 110, float),
+        # (MVA)
+        ('three_phase_short_circuit_power', 111, 118, float),
+        # ()
+        ('x_div_r_ratio', 119, 126, float),
+        # H: hydro, N: nuclear, L: lignite, C: hard coal, G: gas, O: oil, W: wind, F: further
+        ('power_plant_type', 127, 128, str),
+    )
+    __slots__ = ('line',) + tuple(name for name, start, stop, kind in fields)
 
 
 if __name__ == "__main__":
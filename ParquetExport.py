@@ -0,0 +1,155 @@
+"""
+Export of Ucte models to Parquet datasets (requires pyarrow), so archived snapshots can be queried without
+parsing text again. Every section is written to its own dataset (nodes, x_nodes, lines, transformers,
+transformers_regulation, transformers_spec_param) and every row carries date, hour, file type and country parsed
+from file name. Datasets are partitioned by these columns (hive style directories, e.g. date=2020-04-18/hour=9),
+so readers skip files which do not match filter on them.
+"""
+
+import os
+
+import pyarrow as pa
+import pyarrow.dataset
+import pyarrow.parquet as pq
+
+from BatchLoader import iter_batch
+
+table_names = ('nodes', 'x_nodes', 'lines', 'transformers', 'transformers_regulation', 'transformers_spec_param')
+partition_columns = ('date', 'hour', 'file_type', 'country')
+
+
+def get_arrow_type(start, stop, kind):
+    """
+    :return: Arrow type of field of record class
+    """
+    if kind is str:
+        return pa.string()
+    elif kind is int:
+        return pa.int8() if stop - start == 1 else pa.int32()
+    return pa.float64()
+
+
+def get_schema(cls):
+    """
+    :param cls: record class
+    :return: pyarrow.Schema (fields of record class followed by file columns)
+    """
+    fields = [pa.field(name, get_arrow_type(start, stop, kind)) for name, start, stop, kind in cls.fields]
+    fields += [pa.field('date', pa.string()), pa.field('hour', pa.int8()), pa.field('file_type', pa.string()),
+               pa.field('country', pa.string()), pa.field('file_name', pa.string())]
+    return pa.schema(fields)
+
+
+def get_table_column(table, name, arrow_type):
+    """
+    Converts column of NetworkTable without going through Python objects, missing values become nulls
+    :return: pyarrow.Array
+    """
+    import numpy as np
+
+    column = table.column(name)
+    if column.dtype.kind == 'S':
+        return pa.array(np.char.decode(column, 'latin-1'), pa.string())
+    elif column.dtype.kind == 'U':
+        # single character fields are None when line is too short, as in records
+        return pa.array(column, pa.string(), mask=(column == '') if column.itemsize == 4 else None)
+    elif column.dtype.kind == 'i':
+        return pa.array(column, arrow_type, mask=column == -1)
+    missing = np.isnan(column)
+    if pa.types.is_integer(arrow_type):
+        return pa.array(np.where(missing, 0, column).astype(np.int32), arrow_type, mask=missing)
+    return pa.array(column, arrow_type, mask=missing)
+
+
+def get_record_column(records, name, arrow_type):
+    """
+    :return: pyarrow.Array of field of record objects
+    """
+    return pa.array([getattr(record, name) for record in records], arrow_type)
+
+
+def to_arrow(model, records, cls):
+    """
+    :param model: Ucte (gives file columns)
+    :param records: list of records, LazySection or NetworkTable
+    :param cls: record class of records
+    :return: pyarrow.Table
+    """
+    schema = get_schema(cls)
+    count = len(records)
+    if hasattr(records, "columns"):
+        columns = [get_table_column(records, name, schema.field(name).type) for name, start, stop, kind in cls.fields]
+    else:
+        records = list(records)
+        columns = [get_record_column(records, name, schema.field(name).type) for name, start, stop, kind in cls.fields]
+    columns += [pa.array([model.get_date()] * count, pa.string()),
+                pa.array([int(model.HHMM[:2])] * count, pa.int8()),
+                pa.array([model.TY] * count, pa.string()),
+                pa.array([model.cc] * count, pa.string()),
+                pa.array([model.file_name] * count, pa.string())]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def get_tables(model):
+    """
+    :param model: Ucte
+    :return: dictionary {table name: pyarrow.Table}
+    """
+    from Node import Node
+    from Line import Line
+    from Transformer import Transformer
+    from TransformerRegulation import TransformerRegulation
+    from TransformerSpecParam import TransformerSpecParam
+
+    classes = (Node, Node, Line, Transformer, TransformerRegulation, TransformerSpecParam)
+    return {name: to_arrow(model, getattr(model, name), cls) for name, cls in zip(table_names, classes)}
+
+
+def export_parquet(model, directory, partition_by=partition_columns, compression='zstd'):
+    """
+    Writes sections of model to Parquet datasets in directory (one subdirectory per table). Files are named
+    after uct file, so exporting same file again replaces its data.
+    :param model: Ucte (any mode, columnar is fastest)
+    :param directory: string
+    :param partition_by: sequence of file columns ('date', 'hour', 'file_type', 'country')
+    :param compression: string (Parquet compression codec)
+    """
+    file_stem = os.path.splitext(model.file_name)[0]
+    for name, table in get_tables(model).items():
+        pq.write_to_dataset(table, os.path.join(directory, name), partition_cols=list(partition_by),
+                            basename_template=file_stem + "-{i}.parquet", compression=compression,
+                            existing_data_behavior='overwrite_or_ignore')
+
+
+def export_files(file_paths, directory, workers=None, partition_by=partition_columns, compression='zstd'):
+    """
+    Parses uct files in parallel (see BatchLoader.iter_batch) and exports them to Parquet datasets
+    :param file_paths: glob pattern or list of paths
+    :return: integer (number of exported files)
+    """
+    count = 0
+    for model in iter_batch(file_paths, workers, columnar=True, keep_lines=False):
+        export_parquet(model, directory, partition_by, compression)
+        count += 1
+    return count
+
+
+def read_table(directory, name, columns=None, filter=None):
+    """
+    Reads exported table, partitions and row groups which do not match filter are skipped, e.g.:
+        read_table(path, 'lines', filter=(pc.field('country') == 'HR') & (pc.field('status') == 8))
+    :param directory: string (directory given to export_parquet)
+    :param name: string (table name, e.g. 'nodes')
+    :param columns: list of column names or None (all columns)
+    :param filter: pyarrow.compute.Expression or None
+    :return: pyarrow.Table
+    """
+    dataset = pyarrow.dataset.dataset(os.path.join(directory, name), format='parquet', partitioning='hive')
+    return dataset.to_table(columns=columns, filter=filter)
+
+
+if __name__ == "__main__":
+    import pyarrow.compute as pc
+
+    export_files("20200418_*_HR?.uct", "ucte_parquet")
+    print(read_table("ucte_parquet", "lines", filter=pc.field('status') == 8).to_pandas())
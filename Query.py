@@ -0,0 +1,206 @@
+"""
+Filtering of Ucte model with bitmap indexes. For every section and indexed attribute there is one bitmap (packed
+boolean array, one bit per record) for every value of attribute, built once when Query is created. Query combines
+bitmaps of its predicates with bitwise operations and results are cached, so repeated queries take microseconds.
+Indexed attributes:
+country: first character of node code (ISO country-code from country_codes_list, e.g. 'HR', or character, e.g. 'H')
+voltage: 7th character of node code (e.g. 1 or '1' for 380 kV, see YBus.nominal_voltages)
+status: status code of record
+power_plant_type: plant type of node (e.g. 'H' hydro, None for blank field)
+Branches (lines and transformers) match country and voltage when one of their nodes matches, e.g. lines with
+country='XX' are tie lines to X-nodes.
+"""
+
+import numpy as np
+
+from Node import Node
+from Line import Line
+from Transformer import Transformer
+from NetworkTable import NetworkTable
+from Ucte import get_country
+
+section_classes = {'nodes': Node, 'x_nodes': Node, 'lines': Line, 'transformers': Transformer}
+node_attributes = ('country', 'voltage', 'status', 'power_plant_type')
+branch_attributes = ('country', 'voltage', 'status')
+
+
+def get_code_chars(codes, position):
+    """
+    :param codes: array of node codes (S8)
+    :param position: integer (index of character in code)
+    :return: array of characters (S1)
+    """
+    if not len(codes):
+        return np.zeros(0, dtype='S1')
+    return np.ascontiguousarray(codes).view('S1').reshape(len(codes), codes.itemsize)[:, position]
+
+
+def normalize_value(attribute, value):
+    """
+    Converts value of predicate to value stored in index
+    """
+    if attribute == 'country':
+        if len(value) > 1:
+            country = get_country(value)
+            if country is None:
+                raise ValueError("unknown country code %s" % value)
+            value = country['country code nodes']
+        return value.encode('latin-1')
+    elif attribute == 'voltage':
+        return str(value).encode('latin-1')
+    elif attribute == 'status':
+        return -1 if value is None else int(value)
+    return '' if value is None else value
+
+
+class BitmapIndex:
+    """
+    Bitmaps of one attribute of section
+    size: integer (number of records)
+    bitmaps: {value: packed boolean array}
+    """
+    def __init__(self, size, *keys):
+        """
+        :param size: integer (number of records)
+        :param keys: arrays of values of every record, record is in bitmap of value when one of arrays has value
+        """
+        self.size = size
+        self.bitmaps = {}
+        for value in np.unique(np.concatenate(keys)).tolist() if size else []:
+            mask = np.zeros(size, dtype=bool)
+            for array in keys:
+                mask |= array == value
+            self.bitmaps[value] = np.packbits(mask)
+        self.empty = np.zeros((size + 7) // 8, dtype=np.uint8)
+
+    def get(self, values):
+        """
+        :param values: list of values (record matches when it has one of them)
+        :return: packed boolean array
+        """
+        bitmaps = [self.bitmaps.get(value, self.empty) for value in values]
+        return bitmaps[0] if len(bitmaps) == 1 else np.bitwise_or.reduce(bitmaps)
+
+
+class Query:
+    """
+    model: Ucte
+    indexes: {section: {attribute: BitmapIndex}}
+    Results are cached by section and predicates, cache is valid as long as model is not changed.
+    """
+    def __init__(self, model):
+        """
+        :param model: Ucte (any mode, columnar is fastest)
+        """
+        self.model = model
+        self.indexes = {}
+        self.cache = {}
+        for section, cls in section_classes.items():
+            table = NetworkTable.from_records(cls, getattr(model, section))
+            size = len(table)
+            if cls is Node:
+                codes = table.column('code')
+                self.indexes[section] = {
+                    'country': BitmapIndex(size, get_code_chars(codes, 0)),
+                    'voltage': BitmapIndex(size, get_code_chars(codes, 6)),
+                    'status': BitmapIndex(size, table.column('status')),
+                    'power_plant_type': BitmapIndex(size, table.column('power_plant_type')),
+                }
+            else:
+                node1, node2 = table.column('node1'), table.column('node2')
+                self.indexes[section] = {
+                    'country': BitmapIndex(size, get_code_chars(node1, 0), get_code_chars(node2, 0)),
+                    'voltage': BitmapIndex(size, get_code_chars(node1, 6), get_code_chars(node2, 6)),
+                    'status': BitmapIndex(size, table.column('status')),
+                }
+
+    def get_key(self, section, predicates):
+        """
+        :return: tuple (section and predicates with values as tuples, usable as dictionary key)
+        """
+        if section not in self.indexes:
+            raise ValueError("unknown section %s" % section)
+        key = [section]
+        for attribute, values in sorted(predicates.items()):
+            if attribute not in self.indexes[section]:
+                raise ValueError("attribute %s is not indexed for %s" % (attribute, section))
+            if isinstance(values, (list, tuple, set, frozenset)):
+                values = tuple(sorted(normalize_value(attribute, value) for value in values))
+            else:
+                values = (normalize_value(attribute, values),)
+            key.append((attribute, values))
+        return tuple(key)
+
+    def get_rows(self, section, **predicates):
+        """
+        Predicate value can be one value or list of values (attribute has one of them), all predicates must match
+        :param section: string ('nodes', 'x_nodes', 'lines' or 'transformers')
+        :return: array of indexes of matching records in section
+        """
+        key = self.get_key(section, predicates)
+        rows = self.cache.get(key)
+        if rows is None:
+            indexes = self.indexes[section]
+            size = len(getattr(self.model, section))
+            if len(key) == 1:
+                rows = np.arange(size)
+            else:
+                bitmaps = [indexes[attribute].get(values) for attribute, values in key[1:]]
+                bitmap = bitmaps[0] if len(bitmaps) == 1 else np.bitwise_and.reduce(bitmaps)
+                rows = np.flatnonzero(np.unpackbits(bitmap, count=size))
+            rows.flags.writeable = False
+            self.cache[key] = rows
+        return rows
+
+    def count(self, section, **predicates):
+        """
+        :return: integer (number of matching records)
+        """
+        return len(self.get_rows(section, **predicates))
+
+    def select(self, section, **predicates):
+        """
+        :param section: string ('nodes', 'x_nodes', 'lines' or 'transformers')
+        :return: list of matching records (TableRow objects in columnar mode)
+        """
+        key = self.get_key(section, predicates)
+        records = self.cache.get(('records',) + key)
+        if records is None:
+            source = getattr(self.model, section)
+            records = [source[row] for row in self.get_rows(section, **predicates).tolist()]
+            self.cache[('records',) + key] = records
+        return list(records)
+
+    def nodes(self, **predicates):
+        """
+        :return: list of nodes (without X-nodes)
+        """
+        return self.select('nodes', **predicates)
+
+    def x_nodes(self, **predicates):
+        """
+        :return: list of X-nodes
+        """
+        return self.select('x_nodes', **predicates)
+
+    def lines(self, **predicates):
+        """
+        :return: list of lines
+        """
+        return self.select('lines', **predicates)
+
+    def transformers(self, **predicates):
+        """
+        :return: list of transformers
+        """
+        return self.select('transformers', **predicates)
+
+
+if __name__ == "__main__":
+    import timeit
+    from Ucte import Ucte
+
+    obj = Ucte("20200418_0930_FO6_HR1.uct", columnar=True)
+    query = Query(obj)
+    print(len(query.nodes(voltage=1, power_plant_type='H')), len(query.lines(country='XX', status=(7, 8, 9))))
+    print("%.1f us" % (timeit.timeit(lambda: query.nodes(voltage=1, power_plant_type='H'), number=1000) * 1000))
@@ -0,0 +1,80 @@
+# encoding of uct files in every reading mode, bytes which are not valid UTF-8 (e.g. files in Windows code page) are
+# decoded to surrogates, so every byte stays one character in its column and is written back unchanged
+encoding = "utf-8"
+encoding_errors = "surrogateescape"
+
+
+def decode_field(line, start, stop, kind):
+    """
+    Reads one field of record line (None for blank or invalid value)
+    :param line: string (line of uct file) or bytes-like object (e.g. memoryview of memory-mapped file)
+    :param start: integer (first column of field)
+    :param stop: integer (last column of field + 1)
+    :param kind: str, int or float
+    :return: string, integer, float or None
+    """
+    if not isinstance(line, str):
+        # whole line is decoded first, columns count characters and not bytes of multibyte characters
+        line = bytes(line).decode(encoding, encoding_errors)
+    text = line[start:stop]
+    if kind is str:
+        text = text.rstrip("\r\n")
+        if stop - start == 1 and not text:
+            return None
+        return text
+    try:
+        return kind(text)
+    except ValueError:
+        return None
+
+
+def restore_record(cls, values):
+    """
+    Creates record from values of its slots (used by pickle)
+    """
+    record = cls.__new__(cls)
+    for name, value in zip(cls.__slots__, values):
+        setattr(record, name, value)
+    return record
+
+
+class Record:
+    """
+    Base class of records of uct file sections (Node, Line, Transformer, TransformerRegulation, TransformerSpecParam).
+    Subclasses list their fields in 'fields' and store them in slots. Record created with lazy=True keeps only
+    its line, every field is decoded on first access and kept for next access.
+    """
+    __slots__ = ()
+    fields = ()
+
+    def __init__(self, line, keep_line=True, lazy=False):
+        """
+        :param line: line of uct file containing record
+        :param keep_line: boolean (False: line is not kept after fields are read, line = None)
+        :param lazy: boolean (True: fields are decoded on first access, line is always kept)
+        """
+        self.line = line
+        if lazy:
+            return
+        for name, start, stop, kind in self.fields:
+            setattr(self, name, decode_field(line, start, stop, kind))
+        if not keep_line:
+            self.line = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.field_columns = {name: (start, stop, kind) for name, start, stop, kind in cls.fields}
+
+    def __getattr__(self, name):
+        # called only for slots which are not set yet, i.e. fields of lazy record
+        try:
+            start, stop, kind = self.field_columns[name]
+        except KeyError:
+            raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name)) from None
+        value = decode_field(self.line, start, stop, kind)
+        setattr(self, name, value)
+        return value
+
+    def __reduce__(self):
+        # values of all slots in one tuple, much faster to pickle than default state of slotted object
+        return restore_record, (type(self), tuple(getattr(self, name) for name in self.__slots__))
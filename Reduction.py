@@ -0,0 +1,205 @@
+"""
+Topology reduction: nodes joined by closed busbar couplers (line status 2) are merged into one bus, so downstream
+computations do not have to handle zero impedance branches. Bus keeps code and name of its first node (nodes before
+X-nodes, in file order), loads and generation of merged nodes are summed, type code, voltage setpoint and generator
+fields come from node with highest type code. Couplers, open couplers (status 7) and branches whose both ends are
+merged into the same bus are removed, other branches are connected to buses.
+"""
+
+import copy
+
+import numpy as np
+
+from Node import Node
+from Line import Line
+from Transformer import Transformer
+from TransformerRegulation import TransformerRegulation
+from TransformerSpecParam import TransformerSpecParam
+from NetworkTable import NetworkTable
+from Topology import get_components
+from YBus import get_bus_indexes, get_keys, line_status_coupler
+
+line_status_open_coupler = 7
+# node fields which are summed over merged nodes
+summed_fields = ('active_load', 'reactive_load', 'active_power_generation', 'reactive_power_generation',
+                 'minimum_permissible_generation_mw', 'maximum_permissible_generation_mw',
+                 'minimum_permissible_generation_mvar', 'maximum_permissible_generation_mvar')
+# node fields taken from node which gives type code of bus (highest type code, first in file order)
+regulating_fields = ('type_code', 'voltage', 'static_of_primary_control', 'nominal_power_of_primary_control',
+                     'three_phase_short_circuit_power', 'x_div_r_ratio', 'power_plant_type')
+# order codes given to parallel branches whose code is already used between same buses
+order_codes = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def select_rows(table, rows):
+    """
+    :param rows: boolean or index array
+    :return: NetworkTable with selected rows
+    """
+    return table.select(rows)
+
+
+def decode_key(key):
+    """
+    :return: tuple (node1, node2, order_code) of strings
+    """
+    return key[0].decode('latin-1'), key[1].decode('latin-1'), key[2]
+
+
+def set_keys(table, keys):
+    """
+    :param keys: list of (node1, node2, order_code) for every row, node codes as bytes
+    :return: NetworkTable with new keys
+    """
+    columns = dict(table.columns)
+    if keys:
+        node1, node2, order_code = zip(*keys)
+        columns['node1'] = np.array(node1, dtype=table.column('node1').dtype)
+        columns['node2'] = np.array(node2, dtype=table.column('node2').dtype)
+        columns['order_code'] = np.array(order_code, dtype=table.column('order_code').dtype)
+    return NetworkTable(table.cls, columns, table.lines)
+
+
+class Reduction:
+    """
+    model: reduced Ucte (columnar)
+    mapping: {node code: bus code} for every node of original model
+    branch_mapping: {(node1, node2, order_code): key in reduced model, None when branch was removed}
+    """
+    def __init__(self, model):
+        """
+        :param model: Ucte (any mode)
+        """
+        blocks = [NetworkTable.from_records(Node, nodes, keep_lines=True) for nodes in model.nodes_by_country.values()]
+        blocks.append(NetworkTable.from_records(Node, model.x_nodes, keep_lines=True))
+        nodes = NetworkTable.concatenate(Node, blocks)
+        lines = NetworkTable.from_records(Line, model.lines, keep_lines=True)
+        transformers = NetworkTable.from_records(Transformer, model.transformers, keep_lines=True)
+        codes = nodes.column('code')
+        self.order = np.argsort(codes, kind='stable')
+        self.sorted_codes = codes[self.order]
+
+        # buses: components of graph of closed couplers, first node of component is its bus
+        coupler = lines.column('status') == line_status_coupler
+        labels = get_components(len(codes), self.get_indexes(lines.column('node1')[coupler]),
+                                self.get_indexes(lines.column('node2')[coupler]))
+        representative = np.unique(labels, return_index=True)[1][labels]
+        self.bus_codes = codes[representative]
+        self.mapping = dict(zip([code.decode('latin-1') for code in codes.tolist()],
+                                [code.decode('latin-1') for code in self.bus_codes.tolist()]))
+
+        merged = self.merge_nodes(nodes, labels)
+        keep = representative == np.arange(len(codes))
+        offsets = np.cumsum([0] + [len(block) for block in blocks])
+        blocks = [select_rows(merged, np.flatnonzero(keep[start:stop]) + start)
+                  for start, stop in zip(offsets[:-1], offsets[1:])]
+
+        # branches: couplers and branches inside one bus are removed
+        line_keep = ~np.isin(lines.column('status'), (line_status_coupler, line_status_open_coupler))
+        line_keys = self.rename_branches(lines, line_keep)
+        transformer_keys = self.rename_branches(transformers, np.ones(len(transformers), dtype=bool))
+        self.branch_mapping = {decode_key(old_key): None if new_key is None else decode_key(new_key)
+                               for old_key, new_key in list(line_keys.items()) + list(transformer_keys.items())}
+
+        self.model = copy.copy(model)
+        self.model.columnar = True
+        self.model.lazy = False
+        self.model.memory_map = False
+        self.model.indexes = None
+        self.model.nodes_by_country = dict(zip(model.nodes_by_country, blocks[:-1]))
+        self.model.nodes = NetworkTable.concatenate(Node, blocks[:-1])
+        self.model.x_nodes = blocks[-1]
+        self.model.lines = self.apply_keys(lines, line_keys)
+        self.model.transformers = self.apply_keys(transformers, transformer_keys)
+        self.model.transformers_regulation = self.apply_keys(
+            NetworkTable.from_records(TransformerRegulation, model.transformers_regulation, keep_lines=True),
+            transformer_keys)
+        self.model.transformers_spec_param = self.apply_keys(
+            NetworkTable.from_records(TransformerSpecParam, model.transformers_spec_param, keep_lines=True),
+            transformer_keys)
+
+    def get_indexes(self, node_codes):
+        """
+        :return: array of indexes of nodes (into nodes followed by X-nodes)
+        """
+        return get_bus_indexes(self.sorted_codes, self.order, node_codes)
+
+    @staticmethod
+    def merge_nodes(nodes, labels):
+        """
+        Loads and generation of nodes are summed over bus, type code is highest of bus (3 slack, 2 voltage control)
+        and voltage setpoint and generator fields are taken from the same node
+        :return: NetworkTable (all nodes, every node has values of its bus)
+        """
+        columns = dict(nodes.columns)
+        for name in summed_fields:
+            column = nodes.column(name)
+            present = np.bincount(labels, weights=~np.isnan(column))
+            total = np.bincount(labels, weights=np.nan_to_num(column))
+            columns[name] = np.where(present[labels] > 0, total[labels], np.nan)
+        # nodes sorted by bus, highest type code first, then by file order: first node of every bus gives its type
+        indexes = np.arange(len(labels))
+        order = np.lexsort((indexes, -nodes.column('type_code').astype(np.int16), labels))
+        first = order[np.unique(labels[order], return_index=True)[1]]
+        source = np.zeros(labels.max(initial=-1) + 1, dtype=np.intp)
+        source[labels[first]] = first
+        rows = source[labels]
+        for name in regulating_fields:
+            columns[name] = nodes.column(name)[rows]
+        return NetworkTable(Node, columns, nodes.lines)
+
+    def rename_branches(self, table, keep):
+        """
+        Connects branches to buses, parallel branches which got same key get next free order code
+        :param table: NetworkTable of lines or transformers
+        :param keep: boolean array (False: branch is removed)
+        :return: dictionary {old key: new key or None}
+        """
+        node1 = self.bus_codes[self.get_indexes(table.column('node1'))]
+        node2 = self.bus_codes[self.get_indexes(table.column('node2'))]
+        keep = keep & (node1 != node2)
+        output = {}
+        used = set()
+        for old_key, new_key, kept in zip(get_keys(table), zip(node1.tolist(), node2.tolist(),
+                                                               table.column('order_code').tolist()), keep.tolist()):
+            if not kept:
+                output[old_key] = None
+                continue
+            if new_key in used:
+                new_key = next((new_key[0], new_key[1], code) for code in order_codes
+                               if (new_key[0], new_key[1], code) not in used)
+            used.add(new_key)
+            output[old_key] = new_key
+        return output
+
+    @staticmethod
+    def apply_keys(table, keys):
+        """
+        Rows get new keys, rows of removed branches are removed ('##R' and '##TT' rows follow their transformer)
+        :return: NetworkTable
+        """
+        new_keys = [keys.get(key) for key in get_keys(table)]
+        table = select_rows(table, np.array([key is not None for key in new_keys], dtype=bool))
+        return set_keys(table, [key for key in new_keys if key is not None])
+
+    def get_bus(self, code):
+        """
+        :param code: string (node code in original model)
+        :return: string (code of bus in reduced model)
+        """
+        return self.mapping[code]
+
+    def get_members(self, bus_code):
+        """
+        :param bus_code: string (code of bus in reduced model)
+        :return: list of codes of original nodes merged into bus
+        """
+        return [code for code, bus in self.mapping.items() if bus == bus_code]
+
+
+if __name__ == "__main__":
+    from Ucte import Ucte
+
+    obj = Ucte("20200418_0930_FO6_HR1.uct", columnar=True)
+    reduction = Reduction(obj)
+    print(len(obj.nodes), len(reduction.model.nodes), len(obj.lines), len(reduction.model.lines))
@@ -0,0 +1,236 @@
+"""
+Time series of attributes of one section over many uct files, stored as dense time x element arrays in .npy files
+which are opened as memory maps, e.g. active_power_generation of every node for every hour of a year.
+Elements are aligned by key (node code, or node1, node2 and order code of branch) and occurrence of key in file
+(number of earlier rows with the same key, so parallel branches with same order code have own columns) and sorted by
+key and occurrence. Element which is not in a file has False in 'present' array and missing value in attribute
+arrays (NaN, -1 for status and type codes, empty string for text), so it is distinguished from blank field by
+'present'.
+Files are parsed in worker processes which keep only keys and selected columns in temporary files, then rows of
+cube are written one file at a time, so memory does not grow with number of files or elements.
+Arrays are time major (one row per file): rows of one file are contiguous, series of one element is strided.
+Directory of cube contains cube.json (manifest with format version, section and attributes, written last), keys.npy,
+occurrences.npy, times.npy (datetime64), file_names.npy, present.npy and <attribute>.npy. Only arrays listed in
+manifest are loaded, arrays of attributes which are not built again are removed when cube is rebuilt in the same
+directory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from Node import Node
+from Line import Line
+from Transformer import Transformer
+from NetworkTable import get_dtype, get_missing
+from BatchLoader import iter_map
+from Ucte import Ucte, get_occurrence_keys
+from Validation import get_branch_keys
+
+section_classes = {'nodes': Node, 'x_nodes': Node, 'lines': Line, 'transformers': Transformer}
+temporary_directory_name = "_files"
+manifest_name = "cube.json"
+cube_format_version = 2
+
+
+def get_section_keys(table):
+    """
+    :return: array of element keys (node code S8, or node1, node2 and order code joined into S17)
+    """
+    return table.column('code') if table.cls is Node else get_branch_keys(table)
+
+
+def get_elements(keys, occurrences):
+    """
+    :return: structured array of (key, occurrence) of elements (sorted and searched as pairs)
+    """
+    elements = np.empty(len(keys), dtype=[('key', keys.dtype), ('occurrence', np.int32)])
+    elements['key'] = keys
+    elements['occurrence'] = occurrences
+    return elements
+
+
+def get_timestamp(model):
+    """
+    :return: numpy.datetime64 (date and time of file, minutes)
+    """
+    return np.datetime64("%s-%s-%sT%s:%s" % (model.yyyymmdd[0:4], model.yyyymmdd[4:6], model.yyyymmdd[6:8],
+                                             model.HHMM[0:2], model.HHMM[2:4]), 'm')
+
+
+def read_manifest(directory):
+    """
+    :return: dictionary {'section': string, 'attributes': list of strings} or None when directory has no cube
+    """
+    try:
+        with open(os.path.join(directory, manifest_name)) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def extract_file(file_path, directory, section, attributes):
+    """
+    Parses uct file and saves keys and columns of section to temporary file (runs in worker process)
+    :return: tuple (path of temporary file, elements, timestamp, file name)
+    """
+    model = Ucte(file_path, columnar=True, keep_lines=False)
+    table = getattr(model, section)
+    keys = get_section_keys(table)
+    occurrences = [occurrence for key, occurrence in get_occurrence_keys(keys.tolist())]
+    elements = get_elements(keys, occurrences)
+    path = os.path.join(directory, hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest() + ".npz")
+    np.savez(path, elements=elements, **{name: table.column(name) for name in attributes})
+    return path, elements, get_timestamp(model), model.file_name
+
+
+def build_cube(file_paths, directory, section='nodes', attributes=('active_power_generation',), workers=None,
+               max_pending=None):
+    """
+    Builds cube of uct files, e.g. build_cube('D:\\uct\\2020*_HR?.uct', 'cube', 'lines', ('status',))
+    :param file_paths: glob pattern or list of paths (see BatchLoader.get_file_paths)
+    :param directory: string (output directory, created when it does not exist)
+    :param section: string ('nodes', 'x_nodes', 'lines' or 'transformers')
+    :param attributes: sequence of attributes of record class of section
+    :param workers: integer (number of processes, default: number of processors)
+    :param max_pending: integer (files parsed ahead, see BatchLoader.iter_map)
+    :return: TimeSeriesCube
+    """
+    if section not in section_classes:
+        raise ValueError("unknown section %s" % section)
+    fields = {name: (start, stop, kind) for name, start, stop, kind in section_classes[section].fields}
+    for name in attributes:
+        if name not in fields:
+            raise ValueError("%s is not attribute of %s" % (name, section))
+    temporary = os.path.join(directory, temporary_directory_name)
+    os.makedirs(temporary, exist_ok=True)
+    # manifest of previous cube is removed first, so cube which is not built completely can not be opened
+    previous = read_manifest(directory)
+    if previous is not None:
+        os.remove(os.path.join(directory, manifest_name))
+        for name in previous['attributes']:
+            if name not in attributes and os.path.exists(os.path.join(directory, name + ".npy")):
+                os.remove(os.path.join(directory, name + ".npy"))
+    try:
+        # first pass: columns of files are saved to temporary files, only union of elements is kept
+        files = []
+        elements = None
+        for path, file_elements, timestamp, file_name in iter_map(extract_file, file_paths, workers, max_pending,
+                                                                   directory=temporary, section=section,
+                                                                   attributes=tuple(attributes)):
+            files.append((path, timestamp, file_name))
+            file_elements = np.unique(file_elements)
+            elements = file_elements if elements is None else np.union1d(elements, file_elements)
+        if elements is None:
+            elements = get_elements(np.zeros(0, dtype='S8' if section_classes[section] is Node else 'S17'), [])
+
+        # second pass: rows of cube are written in order of files
+        shape = (len(files), len(elements))
+        np.save(os.path.join(directory, "keys.npy"), elements['key'])
+        np.save(os.path.join(directory, "occurrences.npy"), elements['occurrence'])
+        np.save(os.path.join(directory, "times.npy"),
+                np.array([timestamp for path, timestamp, file_name in files], dtype='datetime64[m]'))
+        np.save(os.path.join(directory, "file_names.npy"),
+                np.array([file_name for path, timestamp, file_name in files]))
+        present = np.lib.format.open_memmap(os.path.join(directory, "present.npy"), 'w+', bool, shape)
+        arrays = {}
+        for name in attributes:
+            dtype = get_dtype(name, *fields[name])
+            arrays[name] = np.lib.format.open_memmap(os.path.join(directory, name + ".npy"), 'w+', dtype, shape)
+        for row, (path, timestamp, file_name) in enumerate(files):
+            with np.load(path) as data:
+                columns = np.searchsorted(elements, data['elements'])
+                present[row] = False
+                present[row, columns] = True
+                for name, array in arrays.items():
+                    array[row] = get_missing(array.dtype)
+                    array[row, columns] = data[name]
+            os.remove(path)
+        present.flush()
+        for array in arrays.values():
+            array.flush()
+        del present, arrays
+        with open(os.path.join(directory, manifest_name), "w") as handle:
+            json.dump({'version': cube_format_version, 'section': section, 'attributes': list(attributes)}, handle)
+    finally:
+        shutil.rmtree(temporary, ignore_errors=True)
+    return TimeSeriesCube(directory)
+
+
+class TimeSeriesCube:
+    """
+    directory: string
+    section: string ('nodes', 'x_nodes', 'lines' or 'transformers')
+    keys: array of element keys (S8 node codes or S17 branch keys)
+    occurrences: integer array (occurrence of key in file, 0 except for repeated keys)
+    times: datetime64 array (one per file)
+    file_names: array of names of uct files
+    present: boolean memory map (time x element)
+    arrays: {attribute: memory map (time x element)}
+    """
+    def __init__(self, directory, mode='r'):
+        """
+        Opens cube written by build_cube, arrays are memory-mapped and read when they are used
+        :param directory: string
+        :param mode: string ('r' read only, 'r+' arrays can be changed)
+        """
+        manifest = read_manifest(directory)
+        if manifest is None:
+            raise ValueError("%s does not contain cube (%s not found)" % (directory, manifest_name))
+        if manifest.get('version') != cube_format_version:
+            raise ValueError("cube in %s has old format, it must be built again" % directory)
+        self.directory = directory
+        self.section = manifest['section']
+        self.keys = np.load(os.path.join(directory, "keys.npy"))
+        self.occurrences = np.load(os.path.join(directory, "occurrences.npy"))
+        self.times = np.load(os.path.join(directory, "times.npy"))
+        self.file_names = np.load(os.path.join(directory, "file_names.npy"))
+        self.present = np.load(os.path.join(directory, "present.npy"), mmap_mode=mode)
+        self.arrays = {name: np.load(os.path.join(directory, name + ".npy"), mmap_mode=mode)
+                       for name in manifest['attributes']}
+
+    def get(self, attribute):
+        """
+        :param attribute: string (e.g. 'active_power_generation')
+        :return: array (time x element, memory map)
+        """
+        return self.arrays[attribute]
+
+    def get_index(self, key, occurrence=0):
+        """
+        :param key: string (node code) or tuple (node1, node2, order_code)
+        :param occurrence: integer (n-th row with key in file, e.g. 1 for second of parallel branches)
+        :return: integer (column of element)
+        """
+        encoded = "".join(key).encode('latin-1') if isinstance(key, tuple) else key.encode('latin-1')
+        # occurrences of one key are consecutive columns, starting with 0
+        index = int(np.searchsorted(self.keys, encoded)) + occurrence
+        if occurrence < 0 or index >= len(self.keys) or self.keys[index] != encoded or \
+                self.occurrences[index] != occurrence:
+            raise KeyError((key, occurrence))
+        return index
+
+    def get_keys(self):
+        """
+        :return: list of tuples (key, occurrence), key is node code or (node1, node2, order_code) tuple
+        """
+        keys = [key.decode('latin-1') for key in self.keys.tolist()]
+        if self.keys.itemsize != 8:
+            keys = [(key[0:8], key[8:16], key[16:]) for key in keys]
+        return list(zip(keys, self.occurrences.tolist()))
+
+    def get_series(self, attribute, key, occurrence=0):
+        """
+        :return: tuple (array of values over time, boolean array: element is in file)
+        """
+        index = self.get_index(key, occurrence)
+        return np.array(self.arrays[attribute][:, index]), np.array(self.present[:, index])
+
+
+if __name__ == "__main__":
+    cube = build_cube("20200418_*_HR?.uct", "cube_nodes", 'nodes', ('active_power_generation', 'active_load'))
+    print(cube.get('active_load').shape, cube.times[:3])
+    print(cube.get_series('active_power_generation', *cube.get_keys()[0]))
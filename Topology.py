@@ -0,0 +1,205 @@
+"""
+Islands of Ucte model. Buses are nodes followed by X-nodes and branches are lines followed by transformers
+(same order as YBus). Lines with status 7, 8 or 9 and transformers with status 8 or 9 do not connect their nodes.
+Islands are found with union-find and kept up to date when status of one branch is changed: closing branch joins
+two islands, opening branch searches from both its ends until the searches meet or one of them runs out of buses.
+"""
+
+import numpy as np
+
+from Line import Line
+from Transformer import Transformer
+from NetworkTable import NetworkTable
+from YBus import get_bus_indexes, get_bus_table, get_keys, line_statuses_out, transformer_statuses_out
+
+
+def find(parent, bus):
+    """
+    :param parent: list (union-find forest)
+    :return: integer (root of bus, path is halved on the way)
+    """
+    while parent[bus] != bus:
+        parent[bus] = parent[parent[bus]]
+        bus = parent[bus]
+    return bus
+
+
+def get_components(size, bus_from, bus_to):
+    """
+    Union-find with union by size
+    :param size: integer (number of buses)
+    :param bus_from: array of bus indexes
+    :param bus_to: array of bus indexes
+    :return: array (island number of every bus, numbered from 0 in order of first bus)
+    """
+    parent = list(range(size))
+    sizes = [1] * size
+    for first, second in zip(bus_from.tolist(), bus_to.tolist()):
+        first = find(parent, first)
+        second = find(parent, second)
+        if first != second:
+            if sizes[first] < sizes[second]:
+                first, second = second, first
+            parent[second] = first
+            sizes[first] += sizes[second]
+    roots = np.array([find(parent, bus) for bus in range(size)], dtype=np.intp)
+    unique, first_bus, labels = np.unique(roots, return_index=True, return_inverse=True)
+    # renumber islands in order of their first bus
+    order = np.argsort(np.argsort(first_bus))
+    return order[labels.ravel()]
+
+
+class Topology:
+    """
+    codes: array of bus codes (nodes and X-nodes, S8)
+    keys: list of (node1, node2, order_code) of branches (lines followed by transformers)
+    bus_from, bus_to: arrays of bus indexes of branches
+    in_operation: boolean array of branches
+    islands: array (island number of every bus)
+    Adjacency of buses is kept in compressed arrays: branches of bus i are adjacent_branches[starts[i]:starts[i + 1]].
+    """
+    def __init__(self, model):
+        """
+        :param model: Ucte (any mode)
+        """
+        nodes = get_bus_table(model)
+        lines = NetworkTable.from_records(Line, model.lines)
+        transformers = NetworkTable.from_records(Transformer, model.transformers)
+        self.codes = nodes.column('code')
+        order = np.argsort(self.codes, kind='stable')
+        sorted_codes = self.codes[order]
+        self.keys = get_keys(lines) + get_keys(transformers)
+        self.bus_from = np.concatenate([get_bus_indexes(sorted_codes, order, table.column('node1'))
+                                        for table in (lines, transformers)])
+        self.bus_to = np.concatenate([get_bus_indexes(sorted_codes, order, table.column('node2'))
+                                      for table in (lines, transformers)])
+        self.in_operation = np.concatenate([~np.isin(lines.column('status'), line_statuses_out),
+                                            ~np.isin(transformers.column('status'), transformer_statuses_out)])
+
+        # compressed adjacency: every branch is listed at both of its buses
+        size = len(self.codes)
+        branches = np.arange(len(self.keys))
+        ends = np.concatenate([self.bus_from, self.bus_to])
+        order = np.argsort(ends, kind='stable')
+        self.adjacent_branches = np.concatenate([branches, branches])[order]
+        self.adjacent_buses = np.concatenate([self.bus_to, self.bus_from])[order]
+        self.starts = np.concatenate([[0], np.cumsum(np.bincount(ends, minlength=size))])
+
+        used = self.in_operation
+        self.islands = get_components(size, self.bus_from[used], self.bus_to[used])
+        self.island_count = int(self.islands.max()) + 1 if size else 0
+
+    def get_island_count(self):
+        """
+        :return: integer
+        """
+        return self.island_count
+
+    def get_island_codes(self):
+        """
+        :return: list of lists of node codes (one list per island, largest island first)
+        """
+        order = np.argsort(self.islands, kind='stable')
+        groups = np.split(self.codes[order], np.cumsum(np.bincount(self.islands, minlength=self.island_count))[:-1])
+        groups = [[code.decode('latin-1') for code in group.tolist()] for group in groups]
+        return sorted(groups, key=len, reverse=True)
+
+    def get_branch(self, node1, node2, order_code):
+        """
+        :return: integer (index of branch)
+        """
+        return self.keys.index((node1.encode('latin-1'), node2.encode('latin-1'), order_code))
+
+    def get_neighbours(self, bus):
+        """
+        :return: list of buses connected to bus by branches in operation
+        """
+        start, stop = self.starts[bus], self.starts[bus + 1]
+        used = self.in_operation[self.adjacent_branches[start:stop]]
+        return self.adjacent_buses[start:stop][used].tolist()
+
+    def search_split(self, first, second):
+        """
+        Searches from both buses at the same time, one step of each search in turn
+        :return: list of buses of side which is separated from other side, None when buses are still connected
+        """
+        visited = ({first}, {second})
+        frontiers = ([first], [second])
+        while True:
+            for side in (0, 1):
+                if not frontiers[side]:
+                    return list(visited[side])
+                bus = frontiers[side].pop()
+                for neighbour in self.get_neighbours(bus):
+                    if neighbour in visited[1 - side]:
+                        return None
+                    if neighbour not in visited[side]:
+                        visited[side].add(neighbour)
+                        frontiers[side].append(neighbour)
+
+    def set_in_operation(self, branch, in_operation):
+        """
+        Changes status of one branch and updates islands
+        :param branch: integer (index of branch)
+        :param in_operation: boolean
+        :return: boolean (True: islands changed)
+        """
+        if self.in_operation[branch] == in_operation:
+            return False
+        self.in_operation[branch] = in_operation
+        first, second = int(self.bus_from[branch]), int(self.bus_to[branch])
+        first_island, second_island = self.islands[first], self.islands[second]
+        if in_operation:
+            if first_island == second_island:
+                return False
+            # smaller island gets number of bigger one, last island number is moved to free number
+            if np.count_nonzero(self.islands == first_island) < np.count_nonzero(self.islands == second_island):
+                first_island, second_island = second_island, first_island
+            self.islands[self.islands == second_island] = first_island
+            self.island_count -= 1
+            self.islands[self.islands == self.island_count] = second_island
+            return True
+
+        if first == second:
+            return False
+        separated = self.search_split(first, second)
+        if separated is None:
+            return False
+        self.islands[separated] = self.island_count
+        self.island_count += 1
+        return True
+
+    def open_branch(self, branch):
+        """
+        :return: boolean (True: outage of branch splits island)
+        """
+        return self.set_in_operation(branch, False)
+
+    def close_branch(self, branch):
+        """
+        :return: boolean (True: branch joins two islands)
+        """
+        return self.set_in_operation(branch, True)
+
+    def is_splitting(self, branch):
+        """
+        Checks whether outage of branch splits its island, topology is not changed
+        :return: boolean
+        """
+        if not self.in_operation[branch]:
+            return False
+        self.in_operation[branch] = False
+        try:
+            return self.bus_from[branch] != self.bus_to[branch] and \
+                self.search_split(int(self.bus_from[branch]), int(self.bus_to[branch])) is not None
+        finally:
+            self.in_operation[branch] = True
+
+
+if __name__ == "__main__":
+    from Ucte import Ucte
+
+    obj = Ucte("20200418_0930_FO6_HR1.uct", columnar=True)
+    topology = Topology(obj)
+    print(topology.get_island_count(), [len(codes) for codes in topology.get_island_codes()])
+    print([branch for branch in range(len(topology.keys)) if topology.is_splitting(branch)])
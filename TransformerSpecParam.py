@@ -1,58 +1,23 @@
-class TransformerSpecParam:
-    def __init__(self, transformer_line):
-        """
-        :param transformer_line: line of uct file contaning line
-        """
-        self.line = transformer_line
-        self.node1 = self.line[0:8]
-        self.node2 = self.line[9:17]
-        self.order_code = self.line[18]
-        self.tap_postion = self.__get_tap_position()
-        self.resistance_r = self.__get_resistance(0)
-        self.resistance_x = self.__get_resistance(1)
-        self.delta = self.__get_delta()
-        self.angle = self.__get_angle()
+from Record import Record
 
-    def __get_tap_position(self):
-        """
-        n'
-        :return: integer
-        """
-        try:
-            return int(self.line[22:25])
-        except ValueError:
-            return None
 
-    def __get_resistance(self, index):
-        """
-        Pertaining to the rated voltage of the non-regulated winding 1 of the transformer
-        :parameter: index = 0 for Resistance R at tap n’ (Ω) and index = 1 for Reactance X at tap n’ (Ω)
-        :return: float
-        """
-        try:
-            return float(self.line[26 + index * 7:32 + index * 7])
-        except ValueError:
-            return None
-
-    def __get_delta(self):
-        """
-        ∆u at tap n’ (%)
-        :return: float
-        """
-        try:
-            return float(self.line[40:45])
-        except ValueError:
-            return None
-
-    def __get_angle(self):
-        """
-        Phase shift angle α at tap n’ (°) (0° for phase regulation)
-        :return: float
-        """
-        try:
-            return float(self.line[46:51])
-        except ValueError:
-            return None
+class TransformerSpecParam(Record):
+    # (attribute, first column, last column + 1, type) of every field in record line
+    fields = (
+        ('node1', 0, 8, str),
+        ('node2', 9, 17, str),
+        ('order_code', 18, 19, str),
+        # n'
+        ('tap_postion', 22, 25, int),
+        # R and X at tap n' (Ω), pertaining to the rated voltage of the non-regulated winding 1 of the transformer
+        ('resistance_r', 26, 32, float),
+        ('resistance_x', 33, 39, float),
+        # ∆u at tap n' (%)
+        ('delta', 40, 45, float),
+        # Phase shift angle α at tap n' (°) (0° for phase regulation)
+        ('angle', 46, 51, float),
+    )
+    __slots__ = ('line',) + tuple(name for name, start, stop, kind in fields)
 
 
 if __name__ == "__main__":
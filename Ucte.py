@@ -14,11 +14,23 @@ __maintainer__ = "Denis Trputec"
 __email__ = "denis.trputec@hops.hr"
 __status__ = "Completed"
 
+import bz2
+import concurrent.futures
+import contextlib
+import gzip
+import io
+import lzma
+import mmap
+import os
+import zipfile
+
 from Node import Node
 from Line import Line
 from Transformer import Transformer
 from TransformerRegulation import TransformerRegulation
 from TransformerSpecParam import TransformerSpecParam
+from LazySection import LazySection
+from Record import encoding, encoding_errors
 
 country_codes_list = [
     {'#': 1, 'country': 'A', 'name': 'Österreich (Austria)', 'country code nodes': 'O', 'country code': 'AT'},
@@ -60,24 +72,426 @@ country_codes_list = [
 ]
 
 
-def read_lines(file_path, cls, first_line, last_line):
-    # Open UCTE file
-    with open(file_path) as handle:
-        lines = handle.readlines()
+def get_country(country_code):
+    """
+    Returns row of country_codes_list for ISO country-code used in file names and '##Z' node blocks
+    :param country_code: string (e.g. 'HR')
+    :return: dictionary or None
+    """
+    for d in country_codes_list:
+        if d['country code'] == country_code:
+            return d
+
+
+# decompressing file objects for extensions of compressed uct files (zip archives are handled separately)
+compressed_openers = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+
+def split_archive_path(file_path):
+    """
+    Splits path of uct file inside zip archive, e.g. 'D:\\uct\\2020.zip\\20200418_0930_FO6_HR1.uct'
+    :param file_path: string
+    :return: tuple (archive path, member name) or (archive path, None) for archive path alone,
+    (file_path, None) for files which are not in zip archive
+    """
+    normalized = file_path.replace('\\', '/')
+    position = normalized.lower().find('.zip/')
+    if position == -1:
+        return file_path, None
+    return file_path[:position + 4], normalized[position + 5:]
+
+
+def is_compressed(file_path):
+    """
+    :return: boolean (True: file_path is compressed file or zip archive or member of zip archive)
+    """
+    archive_path, member = split_archive_path(file_path)
+    extension = os.path.splitext(archive_path)[1].lower()
+    return extension == '.zip' or extension in compressed_openers
+
+
+def get_archive_members(archive_path):
+    """
+    :param archive_path: string (path to zip archive)
+    :return: list of paths of uct files in archive (archive path followed by member name)
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        return [archive_path + '/' + name for name in archive.namelist() if name.lower().endswith('.uct')]
+
+
+def get_member(archive, archive_path):
+    """
+    :param archive: zipfile.ZipFile
+    :return: string (name of only uct file in archive)
+    """
+    members = [name for name in archive.namelist() if name.lower().endswith('.uct')]
+    if len(members) != 1:
+        raise ValueError("%s contains %d uct files, path of member is needed (e.g. %s)"
+                         % (archive_path, len(members), os.path.join(archive_path, "<member>")))
+    return members[0]
+
+
+def get_inner_name(file_path):
+    """
+    Returns path of uct file without compression extension (name of member for zip archives)
+    :param file_path: string
+    :return: string
+    """
+    archive_path, member = split_archive_path(file_path)
+    extension = os.path.splitext(archive_path)[1].lower()
+    if extension == '.zip':
+        if member is None:
+            with zipfile.ZipFile(archive_path) as archive:
+                member = get_member(archive, archive_path)
+        return member
+    elif extension in compressed_openers:
+        return file_path[:-len(extension)]
+    return file_path
+
+
+def open_compressed(file_path, source=None):
+    """
+    Opens decompressing stream, content is decompressed while it is read
+    :param file_path: string (compressed file, zip archive or member of zip archive)
+    :param source: binary file object with compressed content of file_path or None (file_path is opened)
+    :return: binary file object
+    """
+    archive_path, member = split_archive_path(file_path)
+    extension = os.path.splitext(archive_path)[1].lower()
+    if extension == '.zip':
+        archive = zipfile.ZipFile(archive_path if source is None else source)
+        try:
+            return archive.open(get_member(archive, archive_path) if member is None else member)
+        finally:
+            # member stays readable, file of archive is closed with member
+            archive.close()
+    return compressed_openers[extension](file_path if source is None else source, 'rb')
+
+
+def parse_file_name(file_path):
+    """
+    Reads fields of uct file name 'yyyymmdd_HHMM_TYw_ccv.uct' (see Ucte). Compressed files give fields of
+    inner file name ('yyyymmdd_HHMM_TYw_ccv.uct.gz' or member of zip archive).
+    :param file_path: string (absolute or relative path, Windows or POSIX separators)
+    :return: dictionary {'file_name', 'yyyymmdd', 'HHMM', 'TY', 'w', 'cc', 'v'}
+    """
+    file_name = get_inner_name(file_path).replace('/', '\\').split('\\')[-1]
+    return {
+        'file_name': file_name,
+        'yyyymmdd': file_name[0:8],
+        'HHMM': file_name[9:13],
+        'TY': file_name[14:16],
+        'w': file_name[16:17],
+        'cc': file_name[18:20],
+        'v': file_name.split('.')[0][20:],
+    }
+
+
+section_classes = {
+    "##Z": Node,
+    "##L": Line,
+    "##T": Transformer,
+    "##R": TransformerRegulation,
+    "##TT": TransformerSpecParam,
+}
+
+
+# sections without records, kept as lines of text
+text_markers = ("##C", "##E")
 
-    # Read only necessary par
+
+def get_occurrence_keys(keys):
+    """
+    Makes keys unique by number of earlier rows with the same key (parallel branches with the same order code,
+    repeated rows), e.g. n-th row with a key in one model is matched to n-th row with that key in other model
+    :param keys: iterable of keys (e.g. node code or (node1, node2, order_code))
+    :return: list of tuples (key, occurrence)
+    """
+    counts = {}
     output = []
-    flag_read = False
-    for line in lines:
-        if line == first_line:
-            flag_read = True
+    for key in keys:
+        occurrence = counts.get(key, 0)
+        counts[key] = occurrence + 1
+        output.append((key, occurrence))
+    return output
+
+
+def get_section_class(marker):
+    """
+    :param marker: string (section marker without new line, e.g. '##ZHR', '##L')
+    :return: record class of section or None for sections without records ('##C', '##N', '##E')
+    """
+    return section_classes.get("##Z" if marker.startswith("##Z") else marker)
+
+
+@contextlib.contextmanager
+def open_uct(source):
+    """
+    Opens uct file for reading text lines
+    :param source: string (path to uct file, compressed file or member of zip archive, see is_compressed) or file
+    object (text or binary, e.g. pipe or decompressed stream)
+    :return: context manager giving text file object, file objects given as source are not closed
+    Lines keep their original terminators (new line is not translated), so CRLF files are written back unchanged.
+    """
+    if isinstance(source, (str, os.PathLike)) and is_compressed(os.fspath(source)):
+        # decompressed in the same pass as lines are read
+        with io.TextIOWrapper(open_compressed(os.fspath(source)), encoding, encoding_errors, "") as handle:
+            yield handle
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, encoding=encoding, errors=encoding_errors, newline="") as handle:
+            yield handle
+    elif isinstance(source, (io.RawIOBase, io.BufferedIOBase)):
+        handle = io.TextIOWrapper(source, encoding, encoding_errors, "")
+        try:
+            yield handle
+        finally:
+            handle.detach()
+    else:
+        yield source
+
+
+def is_selected(marker, sections):
+    """
+    :param marker: string (section marker, e.g. '##ZHR')
+    :param sections: set of section markers or None for all sections ('##Z' selects every node block)
+    :return: boolean
+    """
+    return sections is None or marker in sections or marker.startswith("##Z") and "##Z" in sections
+
+
+def iter_section_lines(source, sections=None, text=False):
+    """
+    Streams lines of uct file together with marker of section they belong to, only one line is held in memory
+    :param source: string (path to uct file) or file object
+    :param sections: iterable of section markers to read (e.g. {'##Z', '##L'}, '##Z' is every node block) or None
+    :param text: boolean (True: lines of sections without records, i.e. '##C' comments and '##E' exchange powers,
+        are given too, first line of such section is its marker line)
+    :return: generator of tuples (section marker, line)
+    """
+    sections = None if sections is None else set(sections)
+    marker = None
+    with open_uct(source) as handle:
+        for line in handle:
+            if text and line.startswith(text_markers):
+                marker = line[:3]
+                yield marker, line
+            elif line.startswith("##"):
+                marker = line.rstrip()
+                if get_section_class(marker) is None or not is_selected(marker, sections):
+                    marker = None
+            elif marker is not None:
+                yield marker, line
+
+
+def iter_records(source, sections=None, keep_lines=True, lazy=False, text=False):
+    """
+    Streams records of uct file without building lists, e.g.:
+        for marker, record in iter_records(path, sections={'##L'}):
+            if record.status == 8: ...
+    :param source: string (path to uct file) or file object
+    :param sections: iterable of section markers to read (e.g. {'##Z', '##L'}, '##Z' is every node block) or None
+    :param keep_lines: boolean (False: records do not keep their line of uct file)
+    :param lazy: boolean (True: records decode fields on first access)
+    :param text: boolean (True: lines of '##C' and '##E' sections are given as strings)
+    :return: generator of tuples (section marker, record)
+    """
+    for marker, line in iter_section_lines(source, sections, text):
+        if marker in text_markers:
+            yield marker, line
+        elif lazy:
+            yield marker, get_section_class(marker)(line, lazy=True)
+        else:
+            yield marker, get_section_class(marker)(line, keep_lines)
+
+
+def read_sections(source, columnar=False, keep_lines=True):
+    """
+    Reads uct file in a single pass, every line is sent to record class of section it belongs to.
+    Node sections are kept separately for every country block (e.g. '##ZHR', '##ZXX').
+    :param source: string (can be absolute or relatice path to uct file) or file object
+    :param columnar: boolean (True: sections are returned as NetworkTable objects instead of lists of records)
+    :param keep_lines: boolean (False: records or tables do not keep lines of uct file)
+    :return: dictionary {section marker: list of records}, '##C' and '##E' give lines of text sections
+    """
+    output = {}
+    if columnar:
+        from NetworkTable import NetworkTable
+        for marker, line in iter_section_lines(source, text=True):
+            output.setdefault(marker, []).append(line)
+        for marker, lines in output.items():
+            if marker not in text_markers:
+                output[marker] = NetworkTable.from_lines(get_section_class(marker), lines, keep_lines)
+    else:
+        for marker, record in iter_records(source, keep_lines=keep_lines, text=True):
+            output.setdefault(marker, []).append(record)
+    return output
+
+
+def read_lazy_sections(source):
+    """
+    Reads uct file and finds its sections, records are not built until section is iterated
+    :param source: string (can be absolute or relatice path to uct file) or file object
+    :return: dictionary {section marker: LazySection}
+    """
+    with open_uct(source) as handle:
+        text = handle.read()
+
+    output = {}
+    newline = get_newline(text)
+    for marker, start, stop in index_sections(text):
+        cls = get_section_class(marker)
+        if marker.startswith(text_markers):
+            output[marker[:3]] = [marker + newline] + list(io.StringIO(text[start:stop]))
+        if cls is None:
             continue
-        elif line == last_line:
-            break
-        elif flag_read:
-            node = cls(line)
-            output.append(node)
+        elif marker in output:
+            output[marker].ranges.append((start, stop))
+        else:
+            output[marker] = LazySection(cls, text, [(start, stop)])
+    return output
+
+
+def read_mapped_sections(file_path):
+    """
+    Maps uct file into memory and finds its sections in mapped bytes. Records are not built until section is
+    iterated, their lines are memoryview slices of the map and fields are decoded on first access, so processes
+    reading same file share operating system page cache instead of holding private copies.
+    :param file_path: string (can be absolute or relatice path to uct file)
+    :return: dictionary {section marker: LazySection}
+    """
+    with open(file_path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return {}
+        buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    output = {}
+    newline = get_newline(buffer)
+    for marker, start, stop in index_sections(buffer):
+        cls = get_section_class(marker)
+        if marker.startswith(text_markers):
+            text = buffer[start:stop].decode(encoding, encoding_errors)
+            output[marker[:3]] = [marker + newline] + list(io.StringIO(text))
+        if cls is None:
+            continue
+        elif marker in output:
+            output[marker].ranges.append((start, stop))
+        else:
+            output[marker] = LazySection(cls, buffer, [(start, stop)])
+    return output
+
+
+def read_chunk(file_path, marker, start, stop, columnar=False, keep_lines=True):
+    """
+    Reads records of one section from byte range of uct file (runs in worker process)
+    :param file_path: string
+    :param marker: string (section marker)
+    :param start: integer (offset of first line of chunk)
+    :param stop: integer (offset after last line of chunk)
+    :return: list of records or NetworkTable
+    """
+    with open(file_path, "rb") as handle:
+        handle.seek(start)
+        data = handle.read(stop - start)
+    cls = get_section_class(marker)
+    # same decoding and new line handling as open_uct
+    lines = list(io.TextIOWrapper(io.BytesIO(data), encoding, encoding_errors, ""))
+    if cls is None:
+        return lines
+    elif columnar:
+        from NetworkTable import NetworkTable
+        return NetworkTable.from_lines(cls, lines, keep_lines)
+    return [cls(line, keep_lines) for line in lines]
+
+
+def split_range(buffer, start, stop, count):
+    """
+    Splits byte range into at most count chunks of similar size at new line boundaries
+    :param buffer: bytes-like object with find method (e.g. mmap)
+    :return: list of tuples (start, stop)
+    """
+    size = (stop - start) // count
+    chunks = []
+    while start < stop:
+        end = buffer.find(b"\n", start + size, stop) if size and len(chunks) < count - 1 else -1
+        end = stop if end == -1 else end + 1
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+def read_sections_parallel(file_path, workers=None, columnar=False, keep_lines=True, chunk_size=1 << 20):
+    """
+    Reads sections of uct file in worker processes. Section offsets are found in memory-mapped file, large sections
+    are split into chunks at new line boundaries, chunks are decoded in parallel and joined in file order.
+    Records are sent back from workers by pickle, so columnar mode gains much more than lists of records.
+    :param file_path: string (can be absolute or relatice path to uct file)
+    :param workers: integer (number of processes, default: number of processors)
+    :param columnar: boolean (True: sections are returned as NetworkTable objects instead of lists of records)
+    :param keep_lines: boolean (False: records or tables do not keep lines of uct file)
+    :param chunk_size: integer (minimum size of chunk in bytes)
+    :return: dictionary {section marker: list of records or NetworkTable}
+    """
+    workers = workers or os.cpu_count() or 1
+    with open(file_path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            sections = index_sections(buffer)
+            newline = get_newline(buffer)
+            texts = [(marker, start, stop) for marker, start, stop in sections if marker.startswith(text_markers)]
+            jobs = [(marker, chunk) for marker, start, stop in sections if get_section_class(marker)
+                    for chunk in split_range(buffer, start, stop, max(1, min(workers, (stop - start) // chunk_size)))]
+
+    parts = {}
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        futures = [(marker, executor.submit(read_chunk, file_path, marker, start, stop, columnar, keep_lines))
+                   for marker, (start, stop) in jobs]
+        for marker, future in futures:
+            parts.setdefault(marker, []).append(future.result())
+
+    if columnar:
+        from NetworkTable import NetworkTable
+        output = {marker: NetworkTable.concatenate(get_section_class(marker), tables)
+                  for marker, tables in parts.items()}
+    else:
+        output = {marker: [record for records in lists for record in records] for marker, lists in parts.items()}
+    for marker, start, stop in texts:
+        output[marker[:3]] = [marker + newline] + read_chunk(file_path, marker, start, stop)
+    return output
+
+
+def get_newline(text):
+    """
+    :param text: string (content of uct file) or bytes-like object with find method (e.g. mmap)
+    :return: string (line terminator of first line, '\\r\\n' or '\\n')
+    """
+    end = text.find("\n" if isinstance(text, str) else b"\n")
+    return "\r\n" if end > 0 and text[end - 1] in ("\r", ord("\r")) else "\n"
+
+
+def index_sections(text):
+    """
+    Finds section markers in content of uct file without splitting it into lines
+    :param text: string (content of uct file) or bytes-like object with find method (e.g. mmap)
+    :return: list of tuples (section marker, start, stop) with offsets of section lines in text
+    """
+    newline, prefix = ("\n", "##") if isinstance(text, str) else (b"\n", b"##")
+    starts = [0] if text[:2] == prefix else []
+    position = text.find(newline + prefix)
+    while position != -1:
+        starts.append(position + 1)
+        position = text.find(newline + prefix, position + 1)
 
+    output = []
+    for index, start in enumerate(starts):
+        stop = starts[index + 1] if index + 1 < len(starts) else len(text)
+        end_of_marker = text.find(newline, start, stop)
+        if end_of_marker == -1:
+            end_of_marker = stop
+        marker = text[start:end_of_marker]
+        if not isinstance(marker, str):
+            marker = marker.decode(encoding, encoding_errors)
+        output.append((marker.rstrip(), min(end_of_marker + 1, stop), stop))
     return output
 
 
@@ -90,24 +504,192 @@ class Ucte:
     w: day of the week, starting with 1 for Monday
     cc: the ISO country-code for national datasets
     v: version number starting with 0
+    nodes: nodes of all '##Z' blocks except X-nodes, in file order
+    nodes_by_country: {ISO country-code: list of nodes} for every '##Z' block (merged files contain many)
+    header: lines of '##C' section (marker line with format version and comments)
+    exchanges: lines of '##E' section (scheduled exchange powers), kept as text
+    In columnar mode every list of records is replaced by NetworkTable (NumPy arrays, one per field).
+    In lazy mode every list of records is replaced by LazySection (records are built when section is iterated).
+    In memory map mode sections are LazySection objects over memory-mapped file and line of every record is
+    memoryview of the map.
     """
-    def __init__(self, file_path):
-        """
-        :param file_path: string (can be absolute or relatice path to uct file)
-        """
-        self.file_name = file_path.split('\\')[-1]
-        self.yyyymmdd = self.file_name[0:8]
-        self.HHMM = self.file_name[9:13]
-        self.TY = self.file_name[14:16]
-        self.w = self.file_name[16]
-        self.cc = self.file_name[18:20]
-        self.v = self.file_name.split('.')[0][20:]
-        self.nodes = read_lines(file_path, Node, "##Z" + self.cc + "\n", "##ZXX\n")
-        self.x_nodes = read_lines(file_path, Node, "##ZXX\n", "##L\n")
-        self.lines = read_lines(file_path, Line, "##L\n", "##T\n")
-        self.transformers = read_lines(file_path, Transformer, "##T\n", "##R\n")
-        self.transformers_regulation = read_lines(file_path, TransformerRegulation, "##R\n", "##TT\n")
-        self.transformers_spec_param = read_lines(file_path, TransformerSpecParam, "##TT\n", "##E\n")
+    def __init__(self, file_path, columnar=False, keep_lines=True, lazy=False, source=None, memory_map=False,
+                 workers=1):
+        """
+        :param file_path: string (can be absolute or relatice path to uct file), also compressed file (.gz, .bz2,
+        .xz), zip archive with one uct file or member of zip archive (e.g. 'uct.zip/20200418_0930_FO6_HR1.uct'),
+        fields of file name are then taken from inner file name
+        :param columnar: boolean (True: sections are loaded into NetworkTable objects, requires NumPy)
+        :param keep_lines: boolean (False: records or tables do not keep lines of uct file, saves memory)
+        :param lazy: boolean (True: records are built on first use of section and decode fields on first access)
+        :param source: file object to read instead of file_path (e.g. pipe), file_path then gives only file name
+        (and compression of content of source)
+        :param memory_map: boolean (True: file is memory-mapped, records are lazy)
+        :param workers: integer (more than 1 or None for number of processors: sections are decoded in parallel
+        processes, most useful with columnar mode)
+        """
+        lazy = lazy or memory_map
+        if columnar and lazy:
+            raise ValueError("columnar mode can not be combined with lazy or memory map mode")
+        if (memory_map or workers != 1) and source is not None:
+            raise ValueError("memory map and parallel modes need file path, not file object")
+        if (memory_map or workers != 1) and is_compressed(file_path):
+            raise ValueError("memory map and parallel modes need uncompressed file")
+        if lazy and workers != 1:
+            raise ValueError("lazy mode can not be combined with parallel mode")
+        file_name_fields = parse_file_name(file_path)
+        self.file_name = file_name_fields['file_name']
+        self.yyyymmdd = file_name_fields['yyyymmdd']
+        self.HHMM = file_name_fields['HHMM']
+        self.TY = file_name_fields['TY']
+        self.w = file_name_fields['w']
+        self.cc = file_name_fields['cc']
+        self.v = file_name_fields['v']
+        self.columnar = columnar
+        self.lazy = lazy
+        self.memory_map = memory_map
+        if source is None:
+            source = file_path
+        elif is_compressed(file_path):
+            # source gives compressed content of file_path
+            source = open_compressed(file_path, source)
+        if memory_map:
+            sections = read_mapped_sections(file_path)
+        elif lazy:
+            sections = read_lazy_sections(source)
+        elif workers != 1:
+            sections = read_sections_parallel(file_path, workers, columnar, keep_lines)
+        else:
+            sections = read_sections(source, columnar, keep_lines)
+        self.header = sections.pop("##C", [])
+        self.exchanges = sections.pop("##E", [])
+        self.nodes_by_country = {marker[3:]: records for marker, records in sections.items()
+                                 if marker.startswith("##Z") and marker != "##ZXX"}
+        if columnar:
+            from NetworkTable import NetworkTable
+            self.nodes = NetworkTable.concatenate(Node, list(self.nodes_by_country.values()))
+            for marker in ("##ZXX", "##L", "##T", "##R", "##TT"):
+                sections.setdefault(marker, NetworkTable.from_lines(get_section_class(marker), []))
+        elif lazy:
+            self.nodes = LazySection.concatenate(Node, list(self.nodes_by_country.values()))
+        else:
+            self.nodes = [node for nodes in self.nodes_by_country.values() for node in nodes]
+        self.x_nodes = sections.get("##ZXX", [])
+        self.lines = sections.get("##L", [])
+        self.transformers = sections.get("##T", [])
+        self.transformers_regulation = sections.get("##R", [])
+        self.transformers_spec_param = sections.get("##TT", [])
+        self.indexes = None
+
+    def get_sections(self):
+        """
+        Returns records of every section in order of uct file, node blocks of countries first
+        :return: dictionary {section marker: records} (e.g. '##ZHR', '##ZXX', '##L', '##T', '##R', '##TT')
+        """
+        sections = {"##Z" + country_code: nodes for country_code, nodes in self.nodes_by_country.items()}
+        sections["##ZXX"] = self.x_nodes
+        sections["##L"] = self.lines
+        sections["##T"] = self.transformers
+        sections["##R"] = self.transformers_regulation
+        sections["##TT"] = self.transformers_spec_param
+        return sections
+
+    def build_indexes(self):
+        """
+        Builds dictionaries for lookup of nodes and branches, called on first lookup.
+        Branch key is tuple ((node1, node2, order_code), occurrence), occurrence tells apart parallel branches with
+        the same order code (0 for first in file order, see get_occurrence_keys).
+        :return: dictionary {index name: dictionary}
+        """
+        node_index = {}
+        for node in self.nodes:
+            node_index[node.code] = node
+        for node in self.x_nodes:
+            node_index[node.code] = node
+        line_index, transformer_index, regulation_index = [
+            dict(zip(get_occurrence_keys((record.node1, record.node2, record.order_code) for record in records),
+                     records))
+            for records in (self.lines, self.transformers, self.transformers_regulation)]
+        spec_param_index = {}
+        for spec_param in self.transformers_spec_param:
+            key = (spec_param.node1, spec_param.node2, spec_param.order_code)
+            spec_param_index.setdefault(key, []).append(spec_param)
+        adjacency = {}
+        for branch in list(self.lines) + list(self.transformers):
+            adjacency.setdefault(branch.node1, []).append(branch)
+            adjacency.setdefault(branch.node2, []).append(branch)
+
+        self.indexes = {
+            'nodes': node_index,
+            'lines': line_index,
+            'transformers': transformer_index,
+            'transformers_regulation': regulation_index,
+            'transformers_spec_param': spec_param_index,
+            'adjacency': adjacency,
+        }
+        return self.indexes
+
+    def get_index(self, name):
+        """
+        :param name: string ('nodes', 'lines', 'transformers', 'transformers_regulation', 'transformers_spec_param'
+        or 'adjacency')
+        :return: dictionary
+        """
+        if self.indexes is None:
+            self.build_indexes()
+        return self.indexes[name]
+
+    def get_node(self, code):
+        """
+        Returns node or X-node with given code
+        :param code: string (8 characters node code, e.g. 'HSENJ 2 ')
+        :return: Node or None
+        """
+        return self.get_index('nodes').get(code)
+
+    def get_line(self, node1, node2, order_code, occurrence=0):
+        """
+        :param occurrence: integer (parallel lines with the same order code, 0 for first in file order)
+        :return: Line or None
+        """
+        return self.get_index('lines').get(((node1, node2, order_code), occurrence))
+
+    def get_transformer(self, node1, node2, order_code, occurrence=0):
+        """
+        :param occurrence: integer (parallel transformers with the same order code, 0 for first in file order)
+        :return: Transformer or None
+        """
+        return self.get_index('transformers').get(((node1, node2, order_code), occurrence))
+
+    def get_transformer_regulation(self, node1, node2, order_code, occurrence=0):
+        """
+        Returns regulation of transformer (##R row with same node1, node2 and order_code)
+        :param occurrence: integer (row of parallel transformer with the same order code, 0 for first)
+        :return: TransformerRegulation or None
+        """
+        return self.get_index('transformers_regulation').get(((node1, node2, order_code), occurrence))
+
+    def get_transformer_spec_params(self, node1, node2, order_code):
+        """
+        Returns special parameters of transformer (##TT rows, one for every tap)
+        :return: list of TransformerSpecParam
+        """
+        return self.get_index('transformers_spec_param').get((node1, node2, order_code), [])
+
+    def get_branches(self, code):
+        """
+        Returns lines and transformers connected to node
+        :param code: string (8 characters node code)
+        :return: list of Line and Transformer objects
+        """
+        return self.get_index('adjacency').get(code, [])
+
+    def get_countries(self):
+        """
+        Returns rows of country_codes_list for every '##Z' block in file (unknown codes are skipped)
+        :return: list of dictionaries
+        """
+        return [get_country(cc) for cc in self.nodes_by_country if get_country(cc) is not None]
 
     def get_year(self):
         """
@@ -0,0 +1,304 @@
+"""
+Differences between two Ucte models (e.g. consecutive hourly snapshots) and applying them to base model, so
+a series of snapshots can be stored as one base model and small patches.
+"""
+
+import copy
+
+from Ucte import get_occurrence_keys, get_section_class
+from Node import Node
+from TransformerSpecParam import TransformerSpecParam
+from UcteWriter import format_record, format_table
+
+
+def get_key(record, cls):
+    """
+    Key which identifies record in its section: node code, (node1, node2, order_code) for branches and
+    (node1, node2, order_code, tap_postion) for special parameters of transformer
+    :param record: record object or TableRow
+    :param cls: record class of section
+    :return: string or tuple
+    """
+    if cls is Node:
+        return record.code
+    elif cls is TransformerSpecParam:
+        return record.node1, record.node2, record.order_code, record.tap_postion
+    return record.node1, record.node2, record.order_code
+
+
+def get_table_keys(table, cls):
+    """
+    :param table: NetworkTable
+    :return: list of keys of all rows (see get_key)
+    """
+    if cls is Node:
+        return table.values('code')
+    names = ('node1', 'node2', 'order_code', 'tap_postion') if cls is TransformerSpecParam else \
+        ('node1', 'node2', 'order_code')
+    return list(zip(*(table.values(name) for name in names)))
+
+
+def normalize(value):
+    """
+    :return: value without new line and trailing blanks (fields at end of line are read together with them, lines
+    which are formatted again have no trailing blanks)
+    """
+    return value.rstrip() if isinstance(value, str) else value
+
+
+class UctePatch:
+    """
+    Changes which turn base model into other model, per section marker (e.g. '##ZHR', '##L'):
+    added: {marker: list of lines of uct file} (new records, stored as text)
+    removed: {marker: list of (key, occurrence)}
+    changed: {marker: {(key, occurrence): {attribute: (old value, new value)}}}
+    Records are identified by key and occurrence, see get_occurrence_keys.
+    header, exchanges: lines of '##C' and '##E' sections of other model, None when they are the same
+    """
+    def __init__(self):
+        self.added = {}
+        self.removed = {}
+        self.changed = {}
+        self.header = None
+        self.exchanges = None
+
+    def is_empty(self):
+        """
+        :return: boolean (True: models are the same)
+        """
+        return not (self.added or self.removed or self.changed) and self.header is None and self.exchanges is None
+
+    def get_counts(self):
+        """
+        :return: dictionary {marker: (number of added, removed and changed records)}
+        """
+        markers = dict.fromkeys(list(self.added) + list(self.removed) + list(self.changed))
+        return {marker: (len(self.added.get(marker, [])), len(self.removed.get(marker, [])),
+                         len(self.changed.get(marker, {})))
+                for marker in markers}
+
+    def apply(self, base):
+        """
+        See apply_patch
+        """
+        return apply_patch(base, self)
+
+
+def add_section_diff(patch, marker, added, removed, changed):
+    """
+    Stores differences of one section in patch, empty parts are not stored
+    """
+    if added:
+        patch.added[marker] = added
+    if removed:
+        patch.removed[marker] = removed
+    if changed:
+        patch.changed[marker] = changed
+
+
+def diff_section(patch, marker, base_records, other_records):
+    """
+    Compares records of one section by key and adds differences to patch
+    """
+    cls = get_section_class(marker)
+    names = [name for name, start, stop, kind in cls.fields]
+    base_index = dict(zip(get_occurrence_keys(get_key(record, cls) for record in base_records), base_records))
+    added = []
+    changed = {}
+    for key, record in zip(get_occurrence_keys(get_key(record, cls) for record in other_records), other_records):
+        base_record = base_index.pop(key, None)
+        if base_record is None:
+            added.append(format_record(record))
+            continue
+        fields = {}
+        for name in names:
+            old = normalize(getattr(base_record, name))
+            new = normalize(getattr(record, name))
+            if old != new:
+                fields[name] = (old, new)
+        if fields:
+            changed[key] = fields
+    add_section_diff(patch, marker, added, list(base_index), changed)
+
+
+def diff_tables(patch, marker, base_table, other_table):
+    """
+    Compares two NetworkTable objects of one section, matched rows are compared column by column
+    """
+    import numpy as np
+
+    cls = get_section_class(marker)
+    base_index = {key: index for index, key in enumerate(get_occurrence_keys(get_table_keys(base_table, cls)))}
+    other_keys = get_occurrence_keys(get_table_keys(other_table, cls))
+    base_rows = []
+    other_rows = []
+    added_rows = []
+    for index, key in enumerate(other_keys):
+        base_row = base_index.pop(key, None)
+        if base_row is None:
+            added_rows.append(index)
+        else:
+            base_rows.append(base_row)
+            other_rows.append(index)
+
+    changed = {}
+    base_rows = np.array(base_rows, dtype=np.intp)
+    other_rows = np.array(other_rows, dtype=np.intp)
+    for name, start, stop, kind in cls.fields:
+        old = base_table.column(name)[base_rows]
+        new = other_table.column(name)[other_rows]
+        if old.dtype.kind == 'U':
+            # same as normalize
+            old, new = np.char.rstrip(old), np.char.rstrip(new)
+        different = old != new
+        if old.dtype.kind == 'f':
+            different &= ~(np.isnan(old) & np.isnan(new))
+        for base_row, other_row in zip(base_rows[different].tolist(), other_rows[different].tolist()):
+            key = other_keys[other_row]
+            changed.setdefault(key, {})[name] = (normalize(base_table.get_value(name, base_row)),
+                                                 normalize(other_table.get_value(name, other_row)))
+
+    added = []
+    if added_rows:
+        rows = np.array(added_rows, dtype=np.intp)
+        added = format_table(other_table.select(rows))
+    add_section_diff(patch, marker, added, list(base_index), changed)
+
+
+def diff_ucte(base, other):
+    """
+    Finds records added, removed and changed in other model compared to base model.
+    Nodes are matched by code, branches by (node1, node2, order_code) and repeated keys by their occurrence, every
+    field of matched records is compared
+    (two columnar models are compared column by column, much faster than records).
+    :param base: Ucte (any mode)
+    :param other: Ucte (any mode)
+    :return: UctePatch
+    """
+    patch = UctePatch()
+    base_sections = base.get_sections()
+    other_sections = other.get_sections()
+    for marker in dict.fromkeys(list(base_sections) + list(other_sections)):
+        base_records = base_sections.get(marker, [])
+        other_records = other_sections.get(marker, [])
+        if hasattr(base_records, "columns") and hasattr(other_records, "columns"):
+            diff_tables(patch, marker, base_records, other_records)
+        else:
+            diff_section(patch, marker, base_records, other_records)
+    if list(base.header) != list(other.header):
+        patch.header = list(other.header)
+    if list(base.exchanges) != list(other.exchanges):
+        patch.exchanges = list(other.exchanges)
+    return patch
+
+
+def patch_section(marker, records, patch):
+    """
+    :return: list of records of section after patch (unchanged records are shared with base model)
+    """
+    cls = get_section_class(marker)
+    removed = set(patch.removed.get(marker, []))
+    changed = patch.changed.get(marker, {})
+    output = []
+    for key, record in zip(get_occurrence_keys(get_key(record, cls) for record in records), records):
+        if key in removed:
+            continue
+        elif key in changed:
+            # copy from line, so record of base model is not modified
+            record = cls(format_record(record))
+            for name, (old, new) in changed[key].items():
+                setattr(record, name, new)
+        output.append(record)
+    output.extend(cls(line) for line in patch.added.get(marker, []))
+    return output
+
+
+def patch_table(marker, table, patch):
+    """
+    :return: NetworkTable of section after patch (new arrays, table of base model is not modified)
+    """
+    import numpy as np
+    from NetworkTable import NetworkTable, get_missing
+
+    cls = get_section_class(marker)
+    removed = set(patch.removed.get(marker, []))
+    changed = patch.changed.get(marker, {})
+    keys = get_occurrence_keys(get_table_keys(table, cls))
+    columns = {name: column.copy() for name, column in table.columns.items()}
+    for index, key in enumerate(keys):
+        for name, (old, new) in changed.get(key, {}).items():
+            column = columns[name]
+            if new is None:
+                new = get_missing(column.dtype)
+            elif column.dtype.kind == 'S':
+                new = new.encode('latin-1')
+            column[index] = new
+    keep = np.array([key not in removed for key in keys], dtype=bool)
+    tables = [NetworkTable(cls, {name: column[keep] for name, column in columns.items()},
+                           None if table.lines is None else table.lines[keep])]
+    if marker in patch.added:
+        tables.append(NetworkTable.from_lines(cls, patch.added[marker], keep_lines=True))
+    return NetworkTable.concatenate(cls, tables)
+
+
+def apply_patch(base, patch):
+    """
+    Builds new model from base model and patch, base model is not modified and records (or arrays) which were not
+    changed are shared with it. Patched model of columnar base is columnar, otherwise it holds lists of records.
+    :param base: Ucte (any mode)
+    :param patch: UctePatch (from diff_ucte)
+    :return: Ucte
+    """
+    sections = base.get_sections()
+    for marker in list(patch.added) + list(patch.changed) + list(patch.removed):
+        if marker not in sections and base.columnar:
+            from NetworkTable import NetworkTable
+            sections[marker] = NetworkTable.from_lines(get_section_class(marker), [])
+        sections.setdefault(marker, [])
+    sections = {marker: patch_table(marker, records, patch) if base.columnar else
+                patch_section(marker, records, patch)
+                for marker, records in sections.items()}
+
+    model = copy.copy(base)
+    model.lazy = False
+    model.memory_map = False
+    model.indexes = None
+    model.nodes_by_country = {marker[3:]: records for marker, records in sections.items()
+                              if marker.startswith("##Z") and marker != "##ZXX"}
+    if base.columnar:
+        from NetworkTable import NetworkTable
+        model.nodes = NetworkTable.concatenate(Node, list(model.nodes_by_country.values()))
+    else:
+        model.nodes = [node for nodes in model.nodes_by_country.values() for node in nodes]
+    model.x_nodes = sections["##ZXX"]
+    model.lines = sections["##L"]
+    model.transformers = sections["##T"]
+    model.transformers_regulation = sections["##R"]
+    model.transformers_spec_param = sections["##TT"]
+    model.header = list(base.header) if patch.header is None else list(patch.header)
+    model.exchanges = list(base.exchanges) if patch.exchanges is None else list(patch.exchanges)
+    return model
+
+
+if __name__ == "__main__":
+    from Ucte import Ucte
+
+    obj1 = Ucte("20200418_0930_FO6_HR1.uct", columnar=True)
+    obj2 = Ucte("20200418_1030_FO6_HR1.uct", columnar=True)
+    diff = diff_ucte(obj1, obj2)
+    print(diff.get_counts())
+    for key, fields in diff.changed.get("##L", {}).items():
+        print(key, fields)
+    print(diff_ucte(apply_patch(obj1, diff), obj2).is_empty())
+
+    def add_repeated_keys(model, status):
+        # parallel line with the same order code and repeated '##TT' row
+        line = copy.copy(model.lines[0])
+        line.status = status
+        model.lines.append(line)
+        model.transformers_spec_param.extend(copy.copy(row) for row in model.transformers_spec_param[:1])
+        return model
+
+    obj3 = add_repeated_keys(Ucte("20200418_0930_FO6_HR1.uct"), 8)
+    obj4 = add_repeated_keys(add_repeated_keys(Ucte("20200418_0930_FO6_HR1.uct"), 0), 8)
+    print(diff_ucte(obj3, obj3).is_empty(), diff_ucte(apply_patch(obj3, diff_ucte(obj3, obj4)), obj4).is_empty())
@@ -0,0 +1,302 @@
+"""
+Writes Ucte models back to uct files. Every field is formatted into its fixed width columns, records which were
+read from file and not changed are written with their original line, so unchanged file is written byte for byte
+(also columnar models, whose tables keep lines of rows). Models read with keep_lines=False are formatted from
+values of fields, writing them gives warning.
+"""
+
+import math
+import warnings
+
+from Record import Record, decode_field, encoding, encoding_errors
+
+# records formatted in one batch before writing
+batch_size = 10000
+
+
+def format_value(value, width, kind):
+    """
+    Formats value of field to its width, names are aligned left and numbers right
+    :param value: string, integer, float or None (blank field)
+    :param width: integer (number of columns of field)
+    :param kind: str, int or float
+    :return: string of length width
+    """
+    if value is None or kind is not str and value != value:
+        return " " * width
+    elif kind is str:
+        return str(value)[:width].ljust(width)
+    elif kind is int:
+        text = str(int(value))
+    else:
+        text = repr(float(value))
+        if len(text) > width or "e" in text:
+            text = format_float(value, width)
+    if len(text) > width:
+        raise ValueError("value %r does not fit in %d columns" % (value, width))
+    return text.rjust(width)
+
+
+def format_float(value, width):
+    """
+    :return: string (value with as many decimals as fit in width)
+    """
+    for decimals in range(width - 2, -1, -1):
+        text = "%.*f" % (decimals, value)
+        if len(text) <= width:
+            if "." in text:
+                text = text.rstrip("0")
+                text = text + "0" if text.endswith(".") else text
+            return text
+    return repr(float(value))
+
+
+def get_line(record):
+    """
+    :return: string (line of uct file record was read from) or None
+    """
+    try:
+        line = object.__getattribute__(record, "line")
+    except AttributeError:
+        return None
+    if line is not None and not isinstance(line, str):
+        # memoryview of memory-mapped file
+        line = bytes(line).decode(encoding, encoding_errors)
+    return line
+
+
+def get_changed_fields(record, line):
+    """
+    Finds fields whose value differs from value in line, fields of lazy records which were never read are skipped
+    :param record: record object
+    :param line: string
+    :return: list of tuples (attribute, start, stop, kind, value)
+    """
+    changed = []
+    for name, start, stop, kind in get_fields(record):
+        try:
+            # slot which is not set raises AttributeError instead of decoding line (see Record.__getattr__)
+            value = object.__getattribute__(record, name) if isinstance(record, Record) else getattr(record, name)
+        except AttributeError:
+            continue
+        original = decode_field(line, start, stop, kind)
+        if value != original and not (isinstance(value, float) and math.isnan(value) and original is None):
+            changed.append((name, start, stop, kind, value))
+    return changed
+
+
+def format_record(record, newline="\n"):
+    """
+    Formats record as line of uct file. Line of record is reused when record has it, only changed fields are
+    written into their columns. Records without line (keep_lines=False) are formatted from all fields.
+    :param record: Node, Line, Transformer, TransformerRegulation, TransformerSpecParam or TableRow
+    :param newline: string (line terminator of lines which have none)
+    :return: string (ending with new line)
+    """
+    line = get_line(record)
+    if line is None:
+        fields = [(name, start, stop, kind, getattr(record, name))
+                  for name, start, stop, kind in get_fields(record)]
+        return build_line(fields, newline)
+
+    return patch_line(line, get_changed_fields(record, line), newline)
+
+
+def patch_line(line, changed, newline="\n"):
+    """
+    Writes changed fields into their columns of line, other characters of line are kept
+    :param line: string (line of uct file)
+    :param changed: list of tuples (attribute, start, stop, kind, value)
+    :param newline: string (line terminator of line which has none)
+    :return: string (ending with new line)
+    """
+    if not changed:
+        return line if line.endswith("\n") else line + newline
+    text = line.rstrip("\r\n")
+    end = line[len(text):] or newline
+    chars = list(text.ljust(max(stop for name, start, stop, kind, value in changed)))
+    for name, start, stop, kind, value in changed:
+        chars[start:stop] = format_value(value, stop - start, kind)
+    return "".join(chars) + end
+
+
+def get_fields(record):
+    """
+    :return: fields of record class (TableRow gives fields of record class of its table)
+    """
+    fields = getattr(type(record), "fields", None)
+    return record.table.cls.fields if fields is None else fields
+
+
+def build_line(fields, newline="\n"):
+    """
+    :param fields: list of tuples (attribute, start, stop, kind, value)
+    :param newline: string (line terminator)
+    :return: string (line of uct file without trailing blank fields)
+    """
+    chars = [" "] * max(stop for name, start, stop, kind, value in fields)
+    for name, start, stop, kind, value in fields:
+        chars[start:stop] = format_value(value, stop - start, kind)
+    return "".join(chars).rstrip() + newline
+
+
+def format_column(column, start, stop, kind):
+    """
+    Formats every value of one column of NetworkTable, each distinct value is formatted only once
+    :param column: array
+    :return: array of strings (fixed width)
+    """
+    import numpy as np
+
+    width = stop - start
+    if column.dtype.kind == 'S':
+        return column.astype('U%d' % width)
+    values, inverse = np.unique(column, return_inverse=True)
+    if column.dtype.kind == 'i':
+        # -1 stands for blank field
+        values = [None if value == -1 else value for value in values.tolist()]
+    texts = [format_value(value, width, kind) for value in list(values)]
+    return np.array(texts, dtype='U%d' % width)[inverse.ravel()]
+
+
+def format_table(table, newline="\n"):
+    """
+    Formats all rows of NetworkTable. Table with lines writes them again and only changed fields of changed rows
+    are written into their columns (see format_lines). Table without lines is formatted column by column: every
+    field is formatted for the whole section and fields are placed in their columns of one character array (values
+    are written, not original text).
+    :param table: NetworkTable
+    :param newline: string (line terminator)
+    :return: list of strings (lines of uct file)
+    """
+    import numpy as np
+
+    count = len(table)
+    if count == 0:
+        return []
+    if table.lines is not None:
+        return format_lines(table, newline)
+    fields = table.cls.fields
+    width = max(stop for name, start, stop, kind in fields)
+    chars = np.full((count, width), ord(" "), dtype=np.uint32)
+    for name, start, stop, kind in fields:
+        texts = format_column(table.column(name), start, stop, kind)
+        block = texts.view(np.uint32).reshape(count, stop - start)
+        # shorter strings are padded with zeros by NumPy
+        chars[:, start:stop] = np.where(block == 0, ord(" "), block)
+    lines = chars.view('U%d' % width).ravel().tolist()
+    return [line.rstrip() + newline for line in lines]
+
+
+def format_lines(table, newline="\n"):
+    """
+    Lines of table are decoded again and compared with columns, rows whose values are the same are written with
+    their line, changed fields of other rows are written into their line
+    :param table: NetworkTable with lines
+    :return: list of strings (lines of uct file)
+    """
+    import numpy as np
+    from NetworkTable import decode_lines
+
+    lines = [line.decode(encoding, encoding_errors) for line in table.lines.tolist()]
+    original = decode_lines(lines, table.cls.fields)
+    different = {}
+    for name, start, stop, kind in table.cls.fields:
+        column = table.column(name)
+        mask = column != original[name]
+        if column.dtype.kind == 'f':
+            mask &= ~(np.isnan(column) & np.isnan(original[name]))
+        if mask.any():
+            different[name] = mask
+    output = [line if line.endswith("\n") else line + newline for line in lines]
+    if not different:
+        return output
+    for row in np.flatnonzero(np.logical_or.reduce(list(different.values()))).tolist():
+        changed = [(name, start, stop, kind, table.get_value(name, row))
+                   for name, start, stop, kind in table.cls.fields if name in different and different[name][row]]
+        output[row] = patch_line(lines[row], changed, newline)
+    return output
+
+
+def format_section(records, newline="\n"):
+    """
+    :param records: list of records, LazySection or NetworkTable
+    :param newline: string (terminator of lines which are formatted again)
+    :return: generator of lists of lines (batches of at most batch_size lines)
+    """
+    if hasattr(records, "columns"):
+        for start in range(0, len(records), batch_size):
+            yield format_table(records[start:start + batch_size], newline)
+        return
+    batch = []
+    for record in records:
+        batch.append(format_record(record, newline))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def get_newline(model):
+    """
+    Line terminator of file model was read from, taken from first line of header or first record with line
+    :param model: Ucte
+    :return: string ('\\r\\n' or '\\n', default '\\n')
+    """
+    line = model.header[0] if model.header else None
+    if line is None:
+        for records in model.get_sections().values():
+            if len(records) and not hasattr(records, "columns"):
+                line = get_line(records[0])
+                break
+    return "\r\n" if line is not None and line.endswith("\r\n") else "\n"
+
+
+def has_lines(model):
+    """
+    :return: boolean (False: records of some section have no lines of uct file, e.g. keep_lines=False)
+    """
+    return all(get_line(records[0]) is not None for records in model.get_sections().values() if len(records))
+
+
+def write_ucte(model, file_path):
+    """
+    Writes model to uct file in encoding files are read with (see Record.encoding), markers and lines which are
+    formatted again get line terminator of file model was read from.
+    Lines are formatted in batches and every batch is written with one call.
+    :param model: Ucte (any mode)
+    :param file_path: string (path to uct file) or text file object
+    """
+    if not has_lines(model):
+        warnings.warn("model has no lines of uct file (keep_lines=False), records are formatted from values of "
+                      "fields: number formats and characters outside of fields are not kept", stacklevel=2)
+    if isinstance(file_path, str):
+        handle = open(file_path, "w", encoding=encoding, errors=encoding_errors, newline="")
+    else:
+        handle = file_path
+    newline = get_newline(model)
+    try:
+        handle.write("".join(model.header) if model.header else "##C 2007.05.01" + newline)
+        handle.write("##N" + newline)
+        for marker, records in model.get_sections().items():
+            if marker == "##ZXX" and not len(records):
+                continue
+            handle.write(marker + newline)
+            for batch in format_section(records, newline):
+                handle.write("".join(batch))
+        handle.write("".join(model.exchanges) if model.exchanges else "##E" + newline)
+    finally:
+        if handle is not file_path:
+            handle.close()
+
+
+if __name__ == "__main__":
+    from Ucte import Ucte
+
+    obj = Ucte("20200418_0930_FO6_HR1.uct")
+    for line in obj.lines:
+        if line.status == 0:
+            line.status = 8
+            break
+    write_ucte(obj, "20200418_0930_FO6_HR2.uct")
@@ -0,0 +1,303 @@
+"""
+Checks rules of UCTE data exchange format over whole sections at once (every rule is one NumPy expression over
+columns of section) and references between sections. validate_file reads uct file and reports line numbers,
+validate checks model which is already loaded (rows are given by index in section).
+"""
+
+import io
+
+import numpy as np
+
+from Node import Node
+from NetworkTable import NetworkTable, get_dtype
+from Ucte import get_section_class, index_sections, open_uct
+
+minimum_reactance = 0.050
+real_statuses = (0, 8)
+coupler_statuses = (2, 7)
+node_type_slack = 3
+# voltage is required for nodes with voltage control, other nodes may leave it blank
+voltage_controlled_types = (2, 3)
+
+
+class Issue:
+    """
+    rule: string (name of rule, e.g. 'line_reactance')
+    section: string (section marker, e.g. '##L')
+    row: integer (index of record in section) or None for rules of whole file
+    line_number: integer (line of uct file, from 1) or None
+    element: string (node code or 'node1 node2 order_code')
+    message: string
+    """
+    __slots__ = ('rule', 'section', 'row', 'line_number', 'element', 'message')
+
+    def __init__(self, rule, section, row, line_number, element, message):
+        self.rule = rule
+        self.section = section
+        self.row = row
+        self.line_number = line_number
+        self.element = element
+        self.message = message
+
+    def __repr__(self):
+        if self.line_number is not None:
+            location = "line %d" % self.line_number
+        elif self.section is not None:
+            location = "%s row %d" % (self.section, self.row)
+        else:
+            location = "file"
+        return "%s: %s %s (%s)" % (location, self.rule, self.element, self.message)
+
+
+class ValidationReport:
+    """
+    issues: list of Issue objects, in order of rules and rows
+    """
+    def __init__(self):
+        self.issues = []
+
+    def is_valid(self):
+        """
+        :return: boolean (True: no rule is broken)
+        """
+        return not self.issues
+
+    def get_counts(self):
+        """
+        :return: dictionary {rule: number of issues}
+        """
+        counts = {}
+        for issue in self.issues:
+            counts[issue.rule] = counts.get(issue.rule, 0) + 1
+        return counts
+
+    def get_issues(self, rule):
+        """
+        :return: list of Issue objects of one rule
+        """
+        return [issue for issue in self.issues if issue.rule == rule]
+
+    def __len__(self):
+        return len(self.issues)
+
+    def __iter__(self):
+        return iter(self.issues)
+
+
+def get_elements(table):
+    """
+    :return: list of strings identifying rows (node code or 'node1 node2 order_code')
+    """
+    if table.cls is Node:
+        return [code.decode('latin-1') for code in table.column('code').tolist()]
+    return ["%s %s %s" % (node1.decode('latin-1'), node2.decode('latin-1'), order_code)
+            for node1, node2, order_code in zip(table.column('node1').tolist(), table.column('node2').tolist(),
+                                                table.column('order_code').tolist())]
+
+
+def get_branch_keys(table):
+    """
+    :return: array of node1, node2 and order code of rows joined into one byte string
+    """
+    if not len(table):
+        return np.zeros(0, dtype='S17')
+    return np.char.add(np.char.add(table.column('node1'), table.column('node2')),
+                       np.char.encode(table.column('order_code'), 'latin-1'))
+
+
+class Validator:
+    """
+    Collects issues of sections. Every check adds one issue for every row where mask is True.
+    sections: {marker: NetworkTable}
+    line_numbers: {marker: array of line numbers of rows} (empty when model is validated)
+    """
+    def __init__(self, sections, line_numbers=None, raw_lines=None):
+        """
+        :param sections: dictionary {marker: NetworkTable}
+        :param line_numbers: dictionary {marker: array} or None
+        :param raw_lines: dictionary {marker: list of lines} or None (invalid fields are found only with lines)
+        """
+        self.sections = sections
+        self.line_numbers = line_numbers or {}
+        self.raw_lines = raw_lines or {}
+        self.report = ValidationReport()
+        self.elements = {}
+
+    def add(self, rule, marker, mask, message):
+        """
+        Adds issue for every row of section where mask is True
+        """
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return
+        if marker not in self.elements:
+            self.elements[marker] = get_elements(self.sections[marker])
+        elements = self.elements[marker]
+        line_numbers = self.line_numbers.get(marker)
+        for row in rows.tolist():
+            line_number = int(line_numbers[row]) if line_numbers is not None else None
+            self.report.issues.append(Issue(rule, marker, row, line_number, elements[row], message))
+
+    def check_invalid_fields(self, marker):
+        """
+        Fields which are not blank but could not be read (getters of records give None)
+        """
+        lines = self.raw_lines.get(marker)
+        table = self.sections[marker]
+        if not lines:
+            return
+        cls = table.cls
+        width = max(stop for name, start, stop, kind in cls.fields)
+        chars = np.array(lines, dtype='U%d' % width).view(np.uint32).reshape(len(lines), width)
+        for name, start, stop, kind in cls.fields:
+            dtype = get_dtype(name, start, stop, kind)
+            if dtype.kind not in 'if':
+                continue
+            block = chars[:, start:stop]
+            blank = ((block == ord(' ')) | (block == 0) | (block == ord('\n')) | (block == ord('\r'))).all(axis=1)
+            column = table.column(name)
+            missing = column == -1 if dtype.kind == 'i' else np.isnan(column)
+            self.add('invalid_field', marker, missing & ~blank, "%s can not be read" % name)
+
+    def check_nodes(self, marker):
+        """
+        Voltage must not be 0, nodes with voltage control must have it
+        """
+        table = self.sections[marker]
+        voltage = table.column('voltage')
+        regulated = np.isin(table.column('type_code'), voltage_controlled_types)
+        self.add('node_voltage', marker, (voltage == 0) | (regulated & np.isnan(voltage)),
+                 "voltage reference value must be given and must not be 0")
+
+    def check_branches(self, marker):
+        """
+        R and X of real elements are positive, lines have |X| >= 0.050 ohm (except couplers), couplers have
+        R = X = B = 0 and transformers have both rated voltages
+        """
+        table = self.sections[marker]
+        status = table.column('status')
+        resistance = np.nan_to_num(table.column('resistance_r'))
+        reactance = np.nan_to_num(table.column('resistance_x'))
+        real = np.isin(status, real_statuses)
+        if marker == "##L":
+            coupler = np.isin(status, coupler_statuses)
+            susceptance = np.nan_to_num(table.column('susceptance'))
+            self.add('line_reactance', marker, ~coupler & (np.abs(reactance) < minimum_reactance),
+                     "absolute value of X must be at least %.3f ohm" % minimum_reactance)
+            self.add('line_positive_impedance', marker, real & ((resistance <= 0) | (reactance <= 0)),
+                     "R and X of real element must be positive")
+            self.add('coupler_impedance', marker, coupler & ((resistance != 0) | (reactance != 0) | (susceptance != 0)),
+                     "busbar coupler must have R = X = B = 0")
+        else:
+            self.add('transformer_positive_impedance', marker, real & ((resistance <= 0) | (reactance <= 0)),
+                     "R and X of real element must be positive")
+            for name in ('rated_voltage1', 'rated_voltage2'):
+                self.add('transformer_rated_voltage', marker, ~(np.nan_to_num(table.column(name)) > 0),
+                         "%s must be given and greater than 0" % name)
+
+    def check_slack(self, node_markers):
+        """
+        Exactly one node with type code 3 over all countries (X-nodes are not included)
+        """
+        slack_count = sum(np.count_nonzero(self.sections[marker].column('type_code') == node_type_slack)
+                          for marker in node_markers)
+        if slack_count != 1:
+            self.report.issues.append(Issue('slack_node', None, None, None, '',
+                                            "file has %d slack nodes (type code 3), expected 1" % slack_count))
+        if slack_count > 1:
+            for marker in node_markers:
+                self.add('slack_node', marker, self.sections[marker].column('type_code') == node_type_slack,
+                         "one of %d slack nodes" % slack_count)
+
+    def check_references(self, node_markers):
+        """
+        Branches connect known nodes, '##R' and '##TT' rows belong to transformers of '##T' section
+        """
+        codes = np.concatenate([self.sections[marker].column('code') for marker in node_markers] or
+                               [np.zeros(0, dtype='S8')])
+        codes = np.unique(codes)
+        for marker in ("##L", "##T"):
+            if marker in self.sections:
+                table = self.sections[marker]
+                for name in ('node1', 'node2'):
+                    self.add('unknown_node', marker, ~np.isin(table.column(name), codes),
+                             "%s is not in nodes or X-nodes" % name)
+        transformer_keys = get_branch_keys(self.sections["##T"]) if "##T" in self.sections else np.zeros(0, 'S17')
+        for marker in ("##R", "##TT"):
+            if marker in self.sections:
+                self.add('unknown_transformer', marker,
+                         ~np.isin(get_branch_keys(self.sections[marker]), transformer_keys),
+                         "row does not match any transformer of '##T' section")
+
+    def run(self):
+        """
+        :return: ValidationReport
+        """
+        node_markers = [marker for marker in self.sections if marker.startswith("##Z")]
+        for marker in self.sections:
+            self.check_invalid_fields(marker)
+        for marker in node_markers:
+            self.check_nodes(marker)
+        for marker in ("##L", "##T"):
+            if marker in self.sections:
+                self.check_branches(marker)
+        self.check_slack([marker for marker in node_markers if marker != "##ZXX"])
+        self.check_references(node_markers)
+        return self.report
+
+
+def validate(model):
+    """
+    Validates loaded model, issues have row of record in section instead of line number
+    :param model: Ucte (any mode, columnar is fastest)
+    :return: ValidationReport
+    """
+    sections = {marker: NetworkTable.from_records(get_section_class(marker), records)
+                for marker, records in model.get_sections().items()}
+    return Validator(sections).run()
+
+
+def validate_file(source):
+    """
+    Validates uct file, issues have line numbers. Fields which are not blank but can not be read are reported too.
+    :param source: string (path to uct file) or file object
+    :return: ValidationReport
+    """
+    with open_uct(source) as handle:
+        text = handle.read()
+
+    sections = {}
+    line_numbers = {}
+    raw_lines = {}
+    line_number = 1
+    position = 0
+    for marker, start, stop in index_sections(text):
+        # line of first record is line after marker line
+        line_number += text.count("\n", position, start)
+        position = start
+        cls = get_section_class(marker)
+        if cls is None:
+            continue
+        lines = list(io.StringIO(text[start:stop]))
+        numbers = np.arange(line_number, line_number + len(lines))
+        if marker in sections:
+            # repeated section marker, rows are appended
+            lines = raw_lines[marker] + lines
+            numbers = np.concatenate([line_numbers[marker], numbers])
+        sections[marker] = NetworkTable.from_lines(cls, lines)
+        line_numbers[marker] = numbers
+        raw_lines[marker] = lines
+    for marker in ("##ZXX", "##L", "##T", "##R", "##TT"):
+        if marker not in sections:
+            sections[marker] = NetworkTable.from_lines(get_section_class(marker), [])
+    return Validator(sections, line_numbers, raw_lines).run()
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    report = validate_file("20200418_0930_FO6_HR1.uct")
+    print(report.get_counts(), "%.3f s" % (time.perf_counter() - start))
+    for issue in report.issues[:20]:
+        print(issue)
@@ -0,0 +1,248 @@
+"""
+Network admittance matrix (Y-bus) of Ucte model in per unit, built with NumPy from columns of sections.
+Buses are all nodes followed by X-nodes, nominal voltage of bus is given by 7th character of node code.
+Lines with status 7, 8 or 9 and transformers with status 8 or 9 are out of operation and not in the matrix.
+Busbar couplers (line status 2) have no impedance in uct file, they get small reactance coupler_x.
+Transformer impedance and shunt are given in uct file on side of node 1 (rated voltage 1), ratio and phase shift
+of tap changers are applied on side of node 2 (regulated winding).
+"""
+
+import numpy as np
+
+from Node import Node
+from Line import Line
+from Transformer import Transformer
+from TransformerRegulation import TransformerRegulation
+from TransformerSpecParam import TransformerSpecParam
+from NetworkTable import NetworkTable
+
+# nominal voltage (kV) for 7th character of node code
+nominal_voltages = {'0': 750.0, '1': 380.0, '2': 220.0, '3': 150.0, '4': 120.0, '5': 110.0, '6': 70.0, '7': 27.0,
+                    '8': 330.0, '9': 500.0}
+# status codes of elements out of operation
+line_statuses_out = (7, 8, 9)
+transformer_statuses_out = (8, 9)
+line_status_coupler = 2
+
+
+def get_nominal_voltages(codes, voltages):
+    """
+    :param codes: array of node codes (S8)
+    :param voltages: array of voltages of nodes (used when 7th character of code is not digit)
+    :return: float64 array (kV)
+    """
+    table = np.full(256, np.nan)
+    for char, voltage in nominal_voltages.items():
+        table[ord(char)] = voltage
+    output = table[codes.view(np.uint8).reshape(len(codes), 8)[:, 6]] if len(codes) else np.zeros(0)
+    return np.where(np.isnan(output), voltages, output)
+
+
+def get_bus_table(model):
+    """
+    :param model: Ucte (any mode)
+    :return: NetworkTable of buses (nodes followed by X-nodes)
+    """
+    return NetworkTable.concatenate(Node, [NetworkTable.from_records(Node, model.nodes),
+                                           NetworkTable.from_records(Node, model.x_nodes)])
+
+
+def get_bus_indexes(sorted_codes, order, codes):
+    """
+    :param sorted_codes: sorted array of bus codes
+    :param order: array (bus index of every code in sorted_codes)
+    :param codes: array of node codes of branch ends
+    :return: array of bus indexes
+    """
+    position = np.minimum(np.searchsorted(sorted_codes, codes), max(len(sorted_codes) - 1, 0))
+    found = sorted_codes[position] == codes if len(sorted_codes) else np.zeros(len(codes), dtype=bool)
+    if not found.all():
+        raise ValueError("branch connected to unknown node %s" % codes[~found][0].decode('latin-1'))
+    return order[position]
+
+
+def get_keys(table):
+    """
+    :return: list of keys (node1, node2, order_code) of all rows of branch table
+    """
+    return list(zip(table.column('node1').tolist(), table.column('node2').tolist(),
+                    table.column('order_code').tolist()))
+
+
+def get_tap_factors(transformers, regulations, spec_params):
+    """
+    Complex factor of regulated winding voltage for every transformer, from tap positions of '##R' rows.
+    Phase regulation changes magnitude by n * du, asymmetrical angle regulation adds n * du at angle theta and
+    symmetrical angle regulation shifts phase by 2 * atan(n * du / 2). When '##TT' row is given for current tap,
+    its du, angle, resistance and reactance are used instead.
+    :return: tuple (complex array of factors, resistance and reactance arrays of transformers)
+    """
+    count = len(transformers)
+    factors = np.ones(count, dtype=complex)
+    resistance = transformers.column('resistance_r').copy()
+    reactance = transformers.column('resistance_x').copy()
+    if len(regulations):
+        positions = {key: index for index, key in enumerate(get_keys(transformers))}
+        rows = np.array([positions.get(key, -1) for key in get_keys(regulations)], dtype=np.intp)
+        found = rows >= 0
+        rows = rows[found]
+
+        def column(name):
+            return np.nan_to_num(regulations.column(name)[found])
+
+        phase = 1 + column('phase_regulation_tap_postion') * column('phase_regulation_delta') / 100
+        shift = column('angle_regulation_tap_postion') * column('angle_regulation_delta') / 100
+        theta = np.radians(column('angle_regulation_theta'))
+        symmetrical = np.char.startswith(regulations.column('angle_regulation_type')[found], 'SYMM')
+        angle = np.where(symmetrical, np.exp(2j * np.arctan(shift / 2)), 1 + shift * np.exp(1j * theta))
+        factors[rows] = phase * angle
+
+        if len(spec_params):
+            phase_tap = column('phase_regulation_tap_postion')
+            current_tap = np.where(phase_tap != 0, phase_tap, column('angle_regulation_tap_postion'))
+            taps = dict(zip(rows.tolist(), current_tap.tolist()))
+            for index, key in enumerate(get_keys(spec_params)):
+                row = positions.get(key)
+                if row is not None and taps.get(row) == spec_params.column('tap_postion')[index]:
+                    delta = np.nan_to_num(spec_params.column('delta')[index])
+                    alpha = np.radians(np.nan_to_num(spec_params.column('angle')[index]))
+                    factors[row] = (1 + delta / 100) * np.exp(1j * alpha)
+                    resistance[row] = spec_params.column('resistance_r')[index]
+                    reactance[row] = spec_params.column('resistance_x')[index]
+    return factors, resistance, reactance
+
+
+class Branches:
+    """
+    Lines followed by transformers of Ucte model as arrays, in per unit (pi model with ideal transformer on side
+    of bus_to: current into bus_from is y * (v_from - ratio * v_to) + shunt * v_from)
+    keys: list of (node1, node2, order_code) of branches
+    is_transformer: boolean array
+    bus_from, bus_to: arrays of bus indexes (node1 and node2)
+    series: complex array (series admittance)
+    shunt: complex array (shunt admittance, lines have half of it on each side)
+    ratio: complex array (1 for lines)
+    in_operation: boolean array
+    """
+    def __init__(self, model, sorted_codes, order, nominal, s_base, coupler_x):
+        lines = NetworkTable.from_records(Line, model.lines)
+        transformers = NetworkTable.from_records(Transformer, model.transformers)
+        regulations = NetworkTable.from_records(TransformerRegulation, model.transformers_regulation)
+        spec_params = NetworkTable.from_records(TransformerSpecParam, model.transformers_spec_param)
+        line_count = len(lines)
+        self.keys = get_keys(lines) + get_keys(transformers)
+        self.is_transformer = np.arange(line_count + len(transformers)) >= line_count
+        line_from = get_bus_indexes(sorted_codes, order, lines.column('node1'))
+        line_to = get_bus_indexes(sorted_codes, order, lines.column('node2'))
+        transformer_from = get_bus_indexes(sorted_codes, order, transformers.column('node1'))
+        transformer_to = get_bus_indexes(sorted_codes, order, transformers.column('node2'))
+        self.bus_from = np.concatenate([line_from, transformer_from])
+        self.bus_to = np.concatenate([line_to, transformer_to])
+
+        # lines: impedance in ohm and susceptance in uS on nominal voltage of node 1
+        line_base = nominal[line_from] ** 2 / s_base
+        line_status = lines.column('status')
+        impedance = (np.nan_to_num(lines.column('resistance_r')) + 1j * np.nan_to_num(lines.column('resistance_x')))
+        impedance = impedance / line_base
+        coupler = (line_status == line_status_coupler) | (impedance == 0)
+        impedance[coupler] = 1j * coupler_x
+        line_shunt = 1j * np.nan_to_num(lines.column('susceptance')) * 1e-6 * line_base
+        line_shunt[coupler] = 0
+
+        # transformers: impedance on rated voltage 1, ratio of rated voltages is relative to nominal voltages
+        factors, resistance, reactance = get_tap_factors(transformers, regulations, spec_params)
+        rated1 = transformers.column('rated_voltage1')
+        rated1 = np.where(np.isnan(rated1), nominal[transformer_from], rated1)
+        rated2 = transformers.column('rated_voltage2')
+        rated2 = np.where(np.isnan(rated2), nominal[transformer_to], rated2)
+        transformer_base = nominal[transformer_from] ** 2 / s_base
+        transformer_impedance = (np.nan_to_num(resistance) + 1j * np.nan_to_num(reactance)) / transformer_base
+        transformer_impedance[transformer_impedance == 0] = 1j * coupler_x
+        transformer_shunt = (np.nan_to_num(transformers.column('conductance')) +
+                             1j * np.nan_to_num(transformers.column('suscepatance'))) * 1e-6 * transformer_base
+        ratio = (rated1 / nominal[transformer_from]) / (rated2 * factors / nominal[transformer_to])
+
+        self.series = 1 / np.concatenate([impedance, transformer_impedance])
+        self.shunt = np.concatenate([line_shunt, transformer_shunt])
+        self.ratio = np.concatenate([np.ones(line_count, dtype=complex), ratio])
+        self.in_operation = np.concatenate([~np.isin(line_status, line_statuses_out),
+                                            ~np.isin(transformers.column('status'), transformer_statuses_out)])
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class YBus:
+    """
+    nodes: NetworkTable of buses (nodes followed by X-nodes, see get_bus_table)
+    codes: array of bus codes (nodes and X-nodes, S8)
+    nominal_voltage: array (kV)
+    branches: Branches
+    s_base: float (MVA)
+    Matrix is available as COO arrays (rows, columns, values) or SciPy sparse matrix (get_matrix).
+    """
+    def __init__(self, model, s_base=100.0, coupler_x=1e-4):
+        """
+        :param model: Ucte (any mode, columnar is fastest)
+        :param s_base: float (base power in MVA)
+        :param coupler_x: float (reactance of busbar couplers in per unit)
+        """
+        self.nodes = get_bus_table(model)
+        self.codes = self.nodes.column('code')
+        self.nominal_voltage = get_nominal_voltages(self.codes, self.nodes.column('voltage'))
+        self.s_base = s_base
+        order = np.argsort(self.codes, kind='stable')
+        self.branches = Branches(model, self.codes[order], order, self.nominal_voltage, s_base, coupler_x)
+        self.rows, self.columns, self.values = self.get_coo()
+
+    def get_coo(self, in_operation=None):
+        """
+        :param in_operation: boolean array of branches (default: status of branches in model)
+        :return: tuple of arrays (rows, columns, values), duplicates are summed in matrix
+        """
+        branches = self.branches
+        used = branches.in_operation if in_operation is None else in_operation
+        bus_from = branches.bus_from[used]
+        bus_to = branches.bus_to[used]
+        series = branches.series[used]
+        shunt = branches.shunt[used]
+        ratio = branches.ratio[used]
+        is_transformer = branches.is_transformer[used]
+        # lines have half of shunt on each side, transformers whole shunt on side of node 1
+        shunt_from = np.where(is_transformer, shunt, shunt / 2)
+        shunt_to = np.where(is_transformer, 0, shunt / 2)
+        rows = np.concatenate([bus_from, bus_from, bus_to, bus_to])
+        columns = np.concatenate([bus_from, bus_to, bus_from, bus_to])
+        values = np.concatenate([series + shunt_from, -series * ratio, -series * np.conj(ratio),
+                                 series * np.abs(ratio) ** 2 + shunt_to])
+        return rows, columns, values
+
+    def get_matrix(self):
+        """
+        :return: scipy.sparse.csr_matrix (complex, buses in order of codes)
+        """
+        import scipy.sparse
+
+        size = len(self.codes)
+        return scipy.sparse.coo_matrix((self.values, (self.rows, self.columns)), shape=(size, size)).tocsr()
+
+    def get_bus(self, code):
+        """
+        :param code: string (8 characters node code)
+        :return: integer (row of bus in matrix)
+        """
+        found = np.flatnonzero(self.codes == code.encode('latin-1'))
+        if not len(found):
+            raise KeyError(code)
+        return int(found[0])
+
+
+if __name__ == "__main__":
+    import time
+    from Ucte import Ucte
+
+    obj = Ucte("20200418_0930_FO6_HR1.uct", columnar=True)
+    start = time.perf_counter()
+    ybus = YBus(obj)
+    matrix = ybus.get_matrix()
+    print(matrix.shape, matrix.nnz, "%.3f s" % (time.perf_counter() - start))